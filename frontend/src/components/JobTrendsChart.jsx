@@ -9,6 +9,33 @@ import {
   ResponsiveContainer,
 } from "recharts";
 
+// job_counts column behind each chart series
+const SERIES_TERMS = {
+  "Total DE": "data_engineer",
+  Junior: "junior_data_engineer",
+  Senior: "senior_data_engineer",
+};
+
+// Measured points are solid; carried-forward/interpolated points are hollow
+function renderDot(fill, stroke, radius) {
+  return function SeriesDot({ cx, cy, payload, dataKey, index }) {
+    if (cx == null || cy == null) return null;
+    const estimated = Boolean(payload.imputed[SERIES_TERMS[dataKey]]);
+    return (
+      <circle
+        key={`${dataKey}-${index}`}
+        cx={cx}
+        cy={cy}
+        r={radius}
+        fill={estimated ? "#111827" : fill}
+        stroke={estimated ? fill : stroke}
+        strokeWidth={2}
+        strokeDasharray={estimated ? "2 2" : undefined}
+      />
+    );
+  };
+}
+
 export default function JobTrendsChart({ data }) {
   if (!data || data.length === 0) {
     return (
@@ -31,19 +58,28 @@ export default function JobTrendsChart({ data }) {
     "Total DE": item.data_engineer,
     Junior: item.junior_data_engineer,
     Senior: item.senior_data_engineer,
+    imputed: item.imputed || {},
   }));
 
+  const hasEstimates = chartData.some(
+    (item) => Object.keys(item.imputed).length > 0
+  );
+
   // Custom tooltip with 8-bit aesthetic
   const CustomTooltip = ({ active, payload, label }) => {
     if (active && payload && payload.length) {
       return (
         <div className="bg-black border-2 border-green-500 p-3 font-mono text-sm shadow-lg">
           <p className="text-green-400 font-bold mb-2">[ {label} ]</p>
-          {payload.map((entry, index) => (
-            <p key={index} style={{ color: entry.color }} className="mb-1">
-              {entry.name}: {entry.value} jobs
-            </p>
-          ))}
+          {payload.map((entry, index) => {
+            const method = entry.payload.imputed[SERIES_TERMS[entry.name]];
+            return (
+              <p key={index} style={{ color: entry.color }} className="mb-1">
+                {entry.name}: {entry.value} jobs
+                {method && ` (est. ${method.replace("_", " ")})`}
+              </p>
+            );
+          })}
         </div>
       );
     }
@@ -72,6 +108,12 @@ export default function JobTrendsChart({ data }) {
             </span>
           </div>
         ))}
+        {hasEstimates && (
+          <div className="flex items-center gap-2 font-mono text-sm text-gray-400">
+            <div className="w-4 h-4 rounded-full border-2 border-dashed border-gray-400" />
+            <span>[ ESTIMATED ]</span>
+          </div>
+        )}
       </div>
     );
   };
@@ -114,12 +156,7 @@ export default function JobTrendsChart({ data }) {
             dataKey="Total DE"
             stroke="#60A5FA"
             strokeWidth={3}
-            dot={{
-              r: 4,
-              fill: "#60A5FA",
-              strokeWidth: 2,
-              stroke: "#1E3A8A",
-            }}
+            dot={renderDot("#60A5FA", "#1E3A8A", 4)}
             activeDot={{
               r: 6,
               fill: "#60A5FA",
@@ -132,12 +169,7 @@ export default function JobTrendsChart({ data }) {
             dataKey="Junior"
             stroke="#34D399"
             strokeWidth={3}
-            dot={{
-              r: 4,
-              fill: "#34D399",
-              strokeWidth: 2,
-              stroke: "#065F46",
-            }}
+            dot={renderDot("#34D399", "#065F46", 4)}
             activeDot={{
               r: 6,
               fill: "#34D399",
@@ -150,12 +182,7 @@ export default function JobTrendsChart({ data }) {
             dataKey="Senior"
             stroke="#FBBF24"
             strokeWidth={3}
-            dot={{
-              r: 4,
-              fill: "#FBBF24",
-              strokeWidth: 2,
-              stroke: "#78350F",
-            }}
+            dot={renderDot("#FBBF24", "#78350F", 4)}
             activeDot={{
               r: 6,
               fill: "#FBBF24",
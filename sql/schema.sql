@@ -10,6 +10,7 @@ CREATE TABLE IF NOT EXISTS job_counts (
     data_engineer INTEGER NOT NULL CHECK (data_engineer >= 0),
     junior_data_engineer INTEGER NOT NULL CHECK (junior_data_engineer >= 0),
     senior_data_engineer INTEGER NOT NULL CHECK (senior_data_engineer >= 0),
+    imputed JSONB NOT NULL DEFAULT '{}'::jsonb,
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
 
@@ -17,6 +18,9 @@ CREATE TABLE IF NOT EXISTS job_counts (
     CONSTRAINT unique_week_location UNIQUE (week_starting, location)
 );
 
+-- Add imputation flags to tables created before the adaptive planner
+ALTER TABLE job_counts ADD COLUMN IF NOT EXISTS imputed JSONB NOT NULL DEFAULT '{}'::jsonb;
+
 -- Create index for faster queries by location
 CREATE INDEX IF NOT EXISTS idx_job_counts_location ON job_counts(location);
 
@@ -49,6 +53,7 @@ COMMENT ON COLUMN job_counts.location IS 'Location of the job search (e.g., "Ber
 COMMENT ON COLUMN job_counts.data_engineer IS 'Count for "Data Engineer" search term';
 COMMENT ON COLUMN job_counts.junior_data_engineer IS 'Count for "Junior Data Engineer" search term';
 COMMENT ON COLUMN job_counts.senior_data_engineer IS 'Count for "Senior Data Engineer" search term';
+COMMENT ON COLUMN job_counts.imputed IS 'Count columns not measured this week, mapped to "carried_forward" or "interpolated"';
 
 -- Enable Row Level Security (RLS)
 ALTER TABLE job_counts ENABLE ROW LEVEL SECURITY;
@@ -73,7 +78,9 @@ SELECT
     junior_data_engineer,
     senior_data_engineer,
     collected_at,
-    (data_engineer + junior_data_engineer + senior_data_engineer) as total_count
+    (data_engineer + junior_data_engineer + senior_data_engineer) as total_count,
+    -- Appended last so CREATE OR REPLACE VIEW works on existing databases
+    imputed
 FROM job_counts
 ORDER BY week_starting DESC, location
 LIMIT 52;  -- Last year of weekly data
@@ -0,0 +1,159 @@
+-- Bernalytics Distributed Collection Queue Schema
+-- Run this in your Supabase SQL Editor after schema.sql to enable
+-- `bernalytics enqueue` / `bernalytics worker` with QUEUE_BACKEND=supabase
+
+-- One row per (week, location, term) cell of the collection matrix
+CREATE TABLE IF NOT EXISTS collection_tasks (
+    id BIGSERIAL PRIMARY KEY,
+    week_starting DATE NOT NULL,
+    location VARCHAR(255) NOT NULL,
+    term VARCHAR(64) NOT NULL,
+    search_term VARCHAR(255) NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'leased', 'done', 'failed')),
+    lease_owner VARCHAR(255),
+    lease_expires_at TIMESTAMPTZ,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result_count INTEGER CHECK (result_count >= 0),
+    completed_at TIMESTAMPTZ,
+    saved_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    -- Enqueuing the same week twice must not create duplicate work
+    CONSTRAINT unique_week_location_term UNIQUE (week_starting, location, term)
+);
+
+-- Create index for finding claimable tasks
+CREATE INDEX IF NOT EXISTS idx_collection_tasks_status
+    ON collection_tasks(status, lease_expires_at);
+
+-- Claim up to p_limit pending or expired tasks for a worker.
+-- SKIP LOCKED lets concurrent workers claim disjoint rows without blocking.
+CREATE OR REPLACE FUNCTION claim_collection_tasks(
+    p_worker_id TEXT,
+    p_lease_seconds INTEGER DEFAULT 300,
+    p_limit INTEGER DEFAULT 1,
+    p_max_attempts INTEGER DEFAULT 5
+)
+RETURNS SETOF collection_tasks AS $$
+    UPDATE collection_tasks AS t
+    SET status = 'leased',
+        lease_owner = p_worker_id,
+        lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+        attempts = t.attempts + 1
+    WHERE t.id IN (
+        SELECT id FROM collection_tasks
+        WHERE attempts < p_max_attempts
+          AND (status = 'pending' OR (status = 'leased' AND lease_expires_at < NOW()))
+        ORDER BY week_starting, id
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING t.*;
+$$ LANGUAGE sql;
+
+-- Complete a task only if the caller still holds its lease.
+-- Returns FALSE when the task was reclaimed by another worker.
+CREATE OR REPLACE FUNCTION complete_collection_task(
+    p_task_id BIGINT,
+    p_worker_id TEXT,
+    p_result_count INTEGER
+)
+RETURNS BOOLEAN AS $$
+    WITH updated AS (
+        UPDATE collection_tasks
+        SET status = 'done',
+            result_count = p_result_count,
+            completed_at = NOW(),
+            lease_expires_at = NULL
+        WHERE id = p_task_id
+          AND status = 'leased'
+          AND lease_owner = p_worker_id
+        RETURNING id
+    )
+    SELECT EXISTS (SELECT 1 FROM updated);
+$$ LANGUAGE sql;
+
+-- Extend the lease of a task the caller still holds.
+-- Called before each task of a multi-task claim so later tasks do not expire.
+CREATE OR REPLACE FUNCTION renew_collection_task(
+    p_task_id BIGINT,
+    p_worker_id TEXT,
+    p_lease_seconds INTEGER DEFAULT 300
+)
+RETURNS BOOLEAN AS $$
+    WITH updated AS (
+        UPDATE collection_tasks
+        SET lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+        WHERE id = p_task_id
+          AND status = 'leased'
+          AND lease_owner = p_worker_id
+        RETURNING id
+    )
+    SELECT EXISTS (SELECT 1 FROM updated);
+$$ LANGUAGE sql;
+
+-- Return unstarted tasks to the queue without counting the attempt.
+CREATE OR REPLACE FUNCTION release_collection_tasks(
+    p_task_ids BIGINT[],
+    p_worker_id TEXT
+)
+RETURNS INTEGER AS $$
+    WITH updated AS (
+        UPDATE collection_tasks
+        SET status = 'pending',
+            lease_owner = NULL,
+            lease_expires_at = NULL,
+            attempts = GREATEST(attempts - 1, 0)
+        WHERE id = ANY(p_task_ids)
+          AND status = 'leased'
+          AND lease_owner = p_worker_id
+        RETURNING id
+    )
+    SELECT COUNT(*)::INTEGER FROM updated;
+$$ LANGUAGE sql;
+
+-- Mark expired tasks that have used up their attempts as failed.
+CREATE OR REPLACE FUNCTION fail_exhausted_collection_tasks(
+    p_max_attempts INTEGER DEFAULT 5
+)
+RETURNS SETOF collection_tasks AS $$
+    UPDATE collection_tasks
+    SET status = 'failed',
+        lease_owner = NULL,
+        lease_expires_at = NULL
+    WHERE status = 'leased'
+      AND lease_expires_at < NOW()
+      AND attempts >= p_max_attempts
+    RETURNING *;
+$$ LANGUAGE sql;
+
+-- (week, location) groups whose tasks are all done but whose job_counts row
+-- has not been written yet, e.g. because the saving worker died.
+CREATE OR REPLACE FUNCTION unsaved_collection_groups(p_limit INTEGER DEFAULT 10)
+RETURNS TABLE (week_starting DATE, location VARCHAR) AS $$
+    SELECT t.week_starting, t.location
+    FROM collection_tasks AS t
+    GROUP BY t.week_starting, t.location
+    HAVING bool_and(t.status = 'done') AND bool_or(t.saved_at IS NULL)
+    ORDER BY t.week_starting
+    LIMIT p_limit;
+$$ LANGUAGE sql;
+
+-- Add comments for documentation
+COMMENT ON TABLE collection_tasks IS 'Work queue of (week, location, term) searches claimed by collection workers';
+COMMENT ON COLUMN collection_tasks.term IS 'job_counts column filled by this task (e.g. "junior_data_engineer")';
+COMMENT ON COLUMN collection_tasks.lease_expires_at IS 'Leased tasks past this time can be reclaimed by another worker';
+COMMENT ON COLUMN collection_tasks.saved_at IS 'When the job_counts row for this (week, location) was written';
+
+-- Enable Row Level Security (RLS)
+ALTER TABLE collection_tasks ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable read access for all users" ON collection_tasks
+    FOR SELECT USING (true);
+
+CREATE POLICY "Enable insert for authenticated users only" ON collection_tasks
+    FOR INSERT WITH CHECK (true);
+
+CREATE POLICY "Enable update for authenticated users only" ON collection_tasks
+    FOR UPDATE USING (true);
@@ -3,13 +3,33 @@ SERP API client for fetching LinkedIn job counts via Google Search.
 """
 
 import os
-from typing import Optional
+from typing import Dict, Optional
 
 from loguru import logger
 from serpapi import GoogleSearch
 
 from bernalytics.models import JobCounts
 
+# SerpAPI's "error" message when a query simply has no results
+NO_RESULTS_ERROR = "hasn't returned any results"
+
+
+def search_terms(job_title: str = "Data Engineer") -> Dict[str, str]:
+    """
+    Map each JobCounts field to the search term used to fill it.
+
+    Args:
+        job_title: Base job title (e.g. "Data Engineer")
+
+    Returns:
+        dict: JobCounts field name -> search term
+    """
+    return {
+        "data_engineer": job_title,
+        "junior_data_engineer": f"Junior {job_title}",
+        "senior_data_engineer": f"Senior {job_title}",
+    }
+
 
 class SerpClient:
     """Client for fetching job counts from LinkedIn via Google Search."""
@@ -37,24 +57,21 @@ class SerpClient:
         Returns:
             JobCounts with results for each search term
 
+        Raises:
+            RuntimeError: If SerpAPI returns an error for any of the searches
+
         Note:
             Searches for jobs posted in the past week on LinkedIn.
             Uses 'linkedin.com/jobs' in query instead of site: operator for better results.
         """
         logger.info(f"Fetching job counts for '{job_title}' in {location} (period: {time_period})")
 
-        # Extract city name
-        city = location.split(",")[0].strip()
-
         # Perform three searches (without time filter for accurate counts)
-        data_engineer_count = self._search(job_title, city)
-        junior_count = self._search(f"Junior {job_title}", city)
-        senior_count = self._search(f"Senior {job_title}", city)
-
-        counts = JobCounts(
-            data_engineer=data_engineer_count,
-            junior_data_engineer=junior_count,
-            senior_data_engineer=senior_count,
+        counts = JobCounts.from_terms(
+            {
+                field: self.get_term_count(term, location)
+                for field, term in search_terms(job_title).items()
+            }
         )
 
         logger.info(
@@ -65,6 +82,25 @@ class SerpClient:
 
         return counts
 
+    def get_term_count(self, term: str, location: str) -> int:
+        """
+        Get the job count for a single search term.
+
+        Args:
+            term: Search term (e.g. "Junior Data Engineer")
+            location: Location to search in (e.g. "Berlin, Germany")
+
+        Returns:
+            int: Approximate number of results
+
+        Raises:
+            RuntimeError: If SerpAPI returns an error (e.g. an exhausted quota)
+            Exception: If the request itself fails
+        """
+        # Extract city name
+        city = location.split(",")[0].strip()
+        return self._search(term, city)
+
     def _search(self, term: str, location: str) -> int:
         """
         Execute a single LinkedIn job search.
@@ -85,22 +121,27 @@ class SerpClient:
         try:
             search = GoogleSearch(params)
             results = search.get_dict()
+        except Exception as e:
+            logger.error(f'Error fetching count for "{term}": {e}')
+            raise
 
-            count = 0
+        # SerpAPI reports failures such as an exhausted quota in the body, not as an exception;
+        # an empty result page is reported the same way but is a genuine zero
+        if "error" in results and NO_RESULTS_ERROR not in results["error"]:
+            logger.error(f'SerpAPI error for "{term}": {results["error"]}')
+            raise RuntimeError(f"SerpAPI error: {results['error']}")
 
-            # Try to get total_results from search_information
-            if "search_information" in results:
-                total_results = results["search_information"].get("total_results")
-                if total_results:
-                    count = int(str(total_results).replace(",", ""))
+        count = 0
 
-            # Fallback to organic_results count
-            if count == 0 and "organic_results" in results:
-                count = len(results["organic_results"])
+        # Try to get total_results from search_information
+        if "search_information" in results:
+            total_results = results["search_information"].get("total_results")
+            if total_results:
+                count = int(str(total_results).replace(",", ""))
 
-            logger.info(f'Query "{term}": ~{count} results found')
-            return count
+        # Fallback to organic_results count
+        if count == 0 and "organic_results" in results:
+            count = len(results["organic_results"])
 
-        except Exception as e:
-            logger.error(f'Error fetching count for "{term}": {e}')
-            return 0
+        logger.info(f'Query "{term}": ~{count} results found')
+        return count
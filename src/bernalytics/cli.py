@@ -0,0 +1,111 @@
+"""
+Command-line entry point for Bernalytics.
+
+Provides the ``bernalytics`` command with subcommands for one-off collection,
+the long-running collector daemon, distributed queue workers and the
+quota-aware sampling planner.
+"""
+
+import argparse
+from datetime import datetime
+from typing import List, Optional
+
+from bernalytics import main as collect
+from bernalytics.daemon import run_daemon
+from bernalytics.planner import run_planned_cycle
+from bernalytics.utils.config import get_config, setup_logging
+from bernalytics.worker import enqueue_week, run_worker
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Parse command-line arguments and dispatch to the selected subcommand.
+
+    Args:
+        argv: Argument list (defaults to sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(
+        prog="bernalytics",
+        description="Collect LinkedIn job posting counts for Data Engineering roles",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    collect_parser = subparsers.add_parser("collect", help="Collect job counts once")
+    collect_parser.add_argument(
+        "--write-to-db",
+        action="store_true",
+        help="Save results to Supabase database",
+    )
+
+    subparsers.add_parser(
+        "daemon",
+        help="Run the long-running collector with an in-process scheduler",
+    )
+
+    enqueue_parser = subparsers.add_parser(
+        "enqueue", help="Materialize (location, term) tasks for a week in the work queue"
+    )
+    enqueue_parser.add_argument(
+        "--week",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Any date in the week to enqueue, YYYY-MM-DD; normalized to that week's Monday "
+        "(default: current week)",
+    )
+
+    worker_parser = subparsers.add_parser("worker", help="Claim and execute queued tasks")
+    worker_parser.add_argument(
+        "--exit-when-empty",
+        action="store_true",
+        help="Exit once no task can be claimed instead of polling",
+    )
+    worker_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Number of tasks claimed per round trip (default: 1)",
+    )
+    worker_parser.add_argument(
+        "--no-db",
+        action="store_true",
+        help="Log finished rows instead of saving them to Supabase",
+    )
+
+    plan_parser = subparsers.add_parser(
+        "plan", help="Plan this week's searches within the SERP quota budget"
+    )
+    plan_parser.add_argument(
+        "--execute",
+        action="store_true",
+        help="Run the planned searches and save rows (default: only print the plan)",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "collect":
+        collect.main(write_to_db=args.write_to_db)
+    elif args.command == "daemon":
+        config = get_config()
+        setup_logging(config)
+        run_daemon(config)
+    elif args.command == "enqueue":
+        config = get_config()
+        setup_logging(config)
+        enqueue_week(config, week_starting=args.week)
+    elif args.command == "worker":
+        config = get_config()
+        setup_logging(config)
+        run_worker(
+            config,
+            exit_when_empty=args.exit_when_empty,
+            batch_size=args.batch_size,
+            write_to_db=not args.no_db,
+        )
+    elif args.command == "plan":
+        config = get_config()
+        setup_logging(config)
+        run_planned_cycle(config, execute=args.execute)
+
+
+if __name__ == "__main__":
+    main()
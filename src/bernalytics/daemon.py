@@ -0,0 +1,372 @@
+"""
+Long-running collector daemon.
+
+Keeps a single warm SERP client and Supabase client for the lifetime of the
+process and collects job counts for many locations, each once per week at its
+own jittered time. A small HTTP endpoint exposes health and metrics for local
+probes.
+"""
+
+import heapq
+import json
+import random
+import signal
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from bernalytics.api.serp_client import SerpClient
+from bernalytics.database import DatabaseClient
+from bernalytics.main import get_week_start
+from bernalytics.utils.config import Config
+
+WEEK_SECONDS = 7 * 24 * 3600
+
+# Upper bound on a single scheduler sleep
+MAX_WAIT_SECONDS = 60.0
+
+
+@dataclass
+class LocationStats:
+    """Collection statistics for a single location."""
+
+    runs: int = 0
+    failures: int = 0
+    last_success: Optional[float] = None
+    last_error: Optional[str] = None
+    next_run: Optional[float] = None
+
+
+@dataclass
+class DaemonMetrics:
+    """Thread-safe metrics shared between the scheduler and the HTTP endpoint."""
+
+    started_at: float = field(default_factory=time.time)
+    locations: Dict[str, LocationStats] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, location: str, error: Optional[str] = None) -> None:
+        """Record the outcome of one collection run."""
+        with self._lock:
+            stats = self.locations.setdefault(location, LocationStats())
+            stats.runs += 1
+            if error is None:
+                stats.last_success = time.time()
+                stats.last_error = None
+            else:
+                stats.failures += 1
+                stats.last_error = error
+
+    def schedule(self, location: str, next_run: float) -> None:
+        """Record the wall-clock time of the next run for a location."""
+        with self._lock:
+            self.locations.setdefault(location, LocationStats()).next_run = next_run
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable copy of the current metrics."""
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "uptime_seconds": time.time() - self.started_at,
+                "locations": {
+                    location: {
+                        "runs": stats.runs,
+                        "failures": stats.failures,
+                        "last_success": stats.last_success,
+                        "last_error": stats.last_error,
+                        "next_run": stats.next_run,
+                    }
+                    for location, stats in self.locations.items()
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [
+            "# TYPE bernalytics_uptime_seconds gauge",
+            f"bernalytics_uptime_seconds {snapshot['uptime_seconds']:.0f}",
+            "# TYPE bernalytics_collection_runs_total counter",
+            "# TYPE bernalytics_collection_failures_total counter",
+            "# TYPE bernalytics_last_success_timestamp_seconds gauge",
+        ]
+        for location, stats in snapshot["locations"].items():
+            label = location.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'bernalytics_collection_runs_total{{location="{label}"}} {stats["runs"]}')
+            lines.append(
+                f'bernalytics_collection_failures_total{{location="{label}"}} {stats["failures"]}'
+            )
+            if stats["last_success"] is not None:
+                lines.append(
+                    f'bernalytics_last_success_timestamp_seconds{{location="{label}"}} '
+                    f'{stats["last_success"]:.0f}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    """Serves /healthz and /metrics for the daemon."""
+
+    daemon: "CollectorDaemon"
+
+    def do_GET(self) -> None:
+        if self.path == "/healthz":
+            healthy = not self.daemon.stopping
+            body = json.dumps({"status": "ok" if healthy else "stopping"}).encode()
+            self._respond(200 if healthy else 503, "application/json", body)
+        elif self.path == "/metrics":
+            body = self.daemon.metrics.to_prometheus().encode()
+            self._respond(200, "text/plain; version=0.0.4", body)
+        elif self.path == "/metrics.json":
+            body = json.dumps(self.daemon.metrics.snapshot()).encode()
+            self._respond(200, "application/json", body)
+        else:
+            self._respond(404, "text/plain", b"not found\n")
+
+    def _respond(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"Health endpoint: {format % args}")
+
+
+class CollectorDaemon:
+    """
+    In-process scheduler that collects job counts for many locations.
+
+    Runs are anchored to the same Monday-based week that job_counts is keyed on:
+    each location is collected once per week, at a random offset inside the
+    first `jitter_fraction` of that week, so locations are spread out without
+    ever drifting across a week boundary. Locations whose current week is
+    already stored are skipped, which makes restarts cheap. Runs that fall due
+    together are processed as a batch; a stop request is honoured between
+    locations so no location is ever left with a partially collected week.
+    """
+
+    def __init__(
+        self,
+        serp_client: SerpClient,
+        db_client: DatabaseClient,
+        locations: List[str],
+        job_title: str = "Data Engineer",
+        time_period: str = "week",
+        jitter_fraction: float = 0.1,
+        retry_seconds: float = 3600,
+        host: str = "127.0.0.1",
+        port: int = 8787,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Initialize the daemon.
+
+        Args:
+            serp_client: Warm SERP client reused for every collection
+            db_client: Warm Supabase client reused for every upsert
+            locations: Locations to collect (e.g. ["Berlin, Germany"])
+            job_title: Job title to search for
+            time_period: Time period passed to the SERP client
+            jitter_fraction: Fraction of the week over which runs are spread
+            retry_seconds: Delay before retrying a failed collection
+            host: Bind address for the health/metrics endpoint
+            port: Port for the health/metrics endpoint (0 picks a free port)
+            clock: Source of the current Unix time (overridable for tests)
+        """
+        if not locations:
+            raise ValueError("At least one location is required to run the daemon")
+
+        self.serp_client = serp_client
+        self.db_client = db_client
+        self.locations = list(dict.fromkeys(locations))
+        self.job_title = job_title
+        self.time_period = time_period
+        self.jitter_fraction = jitter_fraction
+        self.retry_seconds = retry_seconds
+        self.host = host
+        self.port = port
+        self.clock = clock
+
+        self.metrics = DaemonMetrics()
+        self._stop = threading.Event()
+        self._queue: List[Tuple[float, str]] = []
+        self._collected: Dict[str, datetime] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @classmethod
+    def from_config(cls, config: Config) -> "CollectorDaemon":
+        """Build a daemon with warm clients from application configuration."""
+        if not config.supabase_url or not config.supabase_key:
+            raise ValueError("Missing Supabase credentials")
+
+        return cls(
+            serp_client=SerpClient(api_key=config.serp_api_key),
+            db_client=DatabaseClient(url=config.supabase_url, key=config.supabase_key),
+            locations=config.locations,
+            job_title=config.job_title,
+            time_period=config.time_period,
+            jitter_fraction=config.daemon_jitter_fraction,
+            host=config.daemon_host,
+            port=config.daemon_port,
+        )
+
+    @property
+    def stopping(self) -> bool:
+        """Whether a shutdown has been requested."""
+        return self._stop.is_set()
+
+    def stop(self) -> None:
+        """Request a graceful shutdown; the in-flight location is allowed to finish."""
+        if not self._stop.is_set():
+            logger.info("Shutdown requested, finishing in-flight collection")
+        self._stop.set()
+
+    def run(self) -> None:
+        """Run the scheduler until stop() is called or SIGINT/SIGTERM is received."""
+        self._install_signal_handlers()
+        self._start_server()
+        self.schedule_all()
+
+        logger.info(
+            f"Collector daemon started for {len(self.locations)} location(s), "
+            f"one run per week within the first {self.jitter_fraction:.0%} of the week"
+        )
+
+        try:
+            while not self._stop.is_set():
+                due_at, _ = self._queue[0]
+                # Wake up at least once a minute so wall-clock jumps are noticed
+                timeout = min(max(0.0, due_at - self.clock()), MAX_WAIT_SECONDS)
+                if self._stop.wait(timeout=timeout):
+                    break
+                self._run_batch(self._pop_due())
+        finally:
+            self._stop_server()
+            logger.info("Collector daemon stopped")
+
+    def schedule_all(self) -> None:
+        """Queue the first run of every location, skipping weeks already stored."""
+        week = self._current_week()
+        for location in self.locations:
+            if self._stored_week(location) == week:
+                self._collected[location] = week
+                logger.info(f"Week {week.date()} already collected for {location}")
+                self._push(location, self._due_at(week + timedelta(days=7)))
+            else:
+                self._push(location, max(self.clock(), self._due_at(week)))
+
+    def collect(self, location: str) -> bool:
+        """
+        Collect and store job counts for a single location.
+
+        A failed search or upsert is recorded in the metrics and the week is
+        left unstored, so the scheduler retries it.
+
+        Returns:
+            bool: True if the week was stored
+        """
+        week = self._current_week()
+        try:
+            counts = self.serp_client.get_job_counts(
+                job_title=self.job_title,
+                location=location,
+                time_period=self.time_period,
+            )
+            self.db_client.save_job_counts(
+                counts=counts,
+                week_starting=week,
+                location=location,
+            )
+        except Exception as e:
+            logger.error(f"Collection failed for {location}: {e}")
+            self.metrics.record(location, error=str(e))
+            return False
+
+        self._collected[location] = week
+        self.metrics.record(location)
+        return True
+
+    def _run_batch(self, batch: List[str]) -> None:
+        for index, location in enumerate(batch):
+            if self._stop.is_set():
+                # Put skipped locations back so the queue stays consistent
+                for skipped in batch[index:]:
+                    self._push(skipped, self.clock())
+                logger.info(f"Skipped {len(batch) - index} location(s) due to shutdown")
+                return
+
+            week = self._current_week()
+            if self._collected.get(location) == week or self.collect(location):
+                self._push(location, self._due_at(week + timedelta(days=7)))
+            else:
+                # Retry within the same week, but never later than the next week's run
+                retry_at = self.clock() + self.retry_seconds
+                next_week = week + timedelta(days=7)
+                self._push(location, min(retry_at, next_week.timestamp()))
+
+    def _pop_due(self) -> List[str]:
+        now = self.clock()
+        batch = []
+        while self._queue and self._queue[0][0] <= now:
+            batch.append(heapq.heappop(self._queue)[1])
+        return batch
+
+    def _push(self, location: str, due_at: float) -> None:
+        heapq.heappush(self._queue, (due_at, location))
+        self.metrics.schedule(location, due_at)
+
+    def _current_week(self) -> datetime:
+        return get_week_start(datetime.fromtimestamp(self.clock()))
+
+    def _due_at(self, week: datetime) -> float:
+        """Pick a jittered run time inside the given week."""
+        offset = random.uniform(0, WEEK_SECONDS * self.jitter_fraction)
+        return (week + timedelta(seconds=offset)).timestamp()
+
+    def _stored_week(self, location: str) -> Optional[datetime]:
+        """Return the most recent week stored for a location, if any."""
+        try:
+            records = self.db_client.get_latest_counts(location, limit=1)
+        except Exception as e:
+            logger.warning(f"Could not look up stored weeks for {location}: {e}")
+            return None
+        if not records:
+            return None
+        return datetime.fromisoformat(records[0]["week_starting"][:10])
+
+    def _install_signal_handlers(self) -> None:
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda signum, frame: self.stop())
+
+    def _start_server(self) -> None:
+        handler = type("Handler", (_HealthHandler,), {"daemon": self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.port = self._server.server_address[1]
+        thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        thread.start()
+        logger.info(f"Health endpoint listening on http://{self.host}:{self.port}/healthz")
+
+    def _stop_server(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def run_daemon(config: Config) -> None:
+    """
+    Run the collector daemon until interrupted.
+
+    Args:
+        config: Application configuration
+    """
+    CollectorDaemon.from_config(config).run()
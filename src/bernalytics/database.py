@@ -6,7 +6,7 @@ database via Supabase.
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from loguru import logger
 from supabase import Client, create_client
@@ -54,6 +54,7 @@ class DatabaseClient:
             "data_engineer": counts.data_engineer,
             "junior_data_engineer": counts.junior_data_engineer,
             "senior_data_engineer": counts.senior_data_engineer,
+            "imputed": counts.imputed,
             "collected_at": datetime.utcnow().isoformat(),
         }
 
@@ -71,6 +72,40 @@ class DatabaseClient:
             logger.error(f"Failed to save job counts to database: {e}")
             raise
 
+    def update_imputed_count(
+        self,
+        week_starting: str,
+        location: str,
+        term: str,
+        value: int,
+        imputed: Dict[str, str],
+    ) -> List[Any]:
+        """
+        Overwrite one imputed count in an existing record.
+
+        Args:
+            week_starting: Week in ISO format
+            location: Location string (e.g., "Berlin, Germany")
+            term: Count column to update (e.g., "junior_data_engineer")
+            value: New estimated count
+            imputed: Full imputation flags for the record
+
+        Returns:
+            list: Updated records
+        """
+        try:
+            response = (
+                self.client.table("job_counts")
+                .update({term: value, "imputed": imputed})
+                .eq("week_starting", week_starting)
+                .eq("location", location)
+                .execute()
+            )
+            return response.data
+        except Exception as e:
+            logger.error(f"Failed to update imputed count: {e}")
+            raise
+
     def get_latest_counts(self, location: str, limit: int = 10) -> list:
         """
         Retrieve the most recent job counts for a location.
@@ -8,14 +8,20 @@ import argparse
 import os
 from datetime import datetime, timedelta
 import logging
+from typing import Optional
 from bernalytics.api.serp_client import SerpClient
 from bernalytics.database import DatabaseClient
 from bernalytics.utils.config import get_config
 
 
-def get_week_start() -> datetime:
-    """Get the start of the current week (Monday)."""
-    today = datetime.now()
+def get_week_start(now: Optional[datetime] = None) -> datetime:
+    """
+    Get the start of the week (Monday) containing `now`.
+
+    Args:
+        now: Reference time (defaults to the current local time)
+    """
+    today = now or datetime.now()
     days_since_monday = today.weekday()
     week_start = today - timedelta(days=days_since_monday)
     return week_start.replace(hour=0, minute=0, second=0, microsecond=0)
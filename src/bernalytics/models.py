@@ -3,6 +3,8 @@ Pydantic model for LinkedIn job search term counts.
 """
 
 from datetime import datetime
+from typing import Dict, Optional
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -16,6 +18,10 @@ class JobCounts(BaseModel):
     senior_data_engineer: int = Field(
         default=0, ge=0, description='Count for "Senior Data Engineer"'
     )
+    imputed: Dict[str, str] = Field(
+        default_factory=dict,
+        description='Fields not measured this week, mapped to "carried_forward" or "interpolated"',
+    )
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -27,6 +33,18 @@ class JobCounts(BaseModel):
         }
     )
 
+    @classmethod
+    def from_terms(
+        cls, counts: Dict[str, int], imputed: Optional[Dict[str, str]] = None
+    ) -> "JobCounts":
+        """Build JobCounts from a mapping of field name to count."""
+        return cls(
+            data_engineer=counts["data_engineer"],
+            junior_data_engineer=counts["junior_data_engineer"],
+            senior_data_engineer=counts["senior_data_engineer"],
+            imputed=imputed or {},
+        )
+
 
 class JobCountRecord(BaseModel):
     """Model representing a database record of job counts."""
@@ -38,3 +56,15 @@ class JobCountRecord(BaseModel):
     data_engineer: int
     junior_data_engineer: int
     senior_data_engineer: int
+    imputed: Dict[str, str] = Field(default_factory=dict)
+
+
+class CollectionTask(BaseModel):
+    """Model representing one (location, term, week) cell in the collection queue."""
+
+    id: int
+    week_starting: str  # Date in ISO format
+    location: str
+    term: str  # JobCounts field name, e.g. "junior_data_engineer"
+    search_term: str  # Query text, e.g. "Junior Data Engineer"
+    attempts: int = 0
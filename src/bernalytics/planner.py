@@ -0,0 +1,456 @@
+"""
+Quota-aware adaptive sampling planner.
+
+Rather than querying every (location, term) cell each week, the planner ranks
+cells by how far their count has probably drifted since it was last measured
+and spends the week's share of the monthly SERP quota on the top of that list.
+Cells that are not queried are carried forward from their last measurement and
+flagged in the record's ``imputed`` column; once a cell is measured again, the
+carried-forward weeks in between are replaced by a linear interpolation.
+"""
+
+import math
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from bernalytics.api.serp_client import SerpClient, search_terms
+from bernalytics.database import DatabaseClient
+from bernalytics.main import get_week_start
+from bernalytics.models import JobCounts
+from bernalytics.utils.config import Config
+
+WEEKS_PER_MONTH = 52 / 12
+
+# Weekly volatility assumed for series with fewer than two measurements
+DEFAULT_VOLATILITY = 1.0
+
+# Floor so that perfectly flat series still age back into the plan
+MIN_VOLATILITY = 0.01
+
+CARRIED_FORWARD = "carried_forward"
+INTERPOLATED = "interpolated"
+
+
+@dataclass
+class SeriesStats:
+    """Sampling statistics for one (location, term) series."""
+
+    location: str
+    term: str
+    volatility: Optional[float] = None
+    last_week: Optional[date] = None
+    last_value: Optional[int] = None
+    staleness_weeks: Optional[int] = None
+
+    @property
+    def priority(self) -> float:
+        """Expected relative drift since the last measurement (random-walk model)."""
+        if self.last_week is None or self.staleness_weeks is None:
+            return math.inf
+        volatility = DEFAULT_VOLATILITY if self.volatility is None else self.volatility
+        return max(volatility, MIN_VOLATILITY) * math.sqrt(self.staleness_weeks)
+
+
+@dataclass
+class CyclePlan:
+    """Which cells to query this cycle and which to carry forward."""
+
+    week_starting: date
+    budget: int
+    spent: int = 0
+    query: List[SeriesStats] = field(default_factory=list)
+    skip: List[SeriesStats] = field(default_factory=list)
+
+
+def measured_points(records: List[Dict[str, Any]], term: str) -> List[Tuple[date, int]]:
+    """
+    Extract the measured (week, value) points of a series, oldest first.
+
+    Args:
+        records: job_counts rows for one location
+        term: Count column (e.g. "junior_data_engineer")
+
+    Returns:
+        list: (week_starting, count) pairs, excluding imputed values
+    """
+    return sorted(
+        (date.fromisoformat(record["week_starting"][:10]), record[term])
+        for record in records
+        if term not in (record.get("imputed") or {})
+    )
+
+
+def series_volatility(points: List[Tuple[date, int]]) -> Optional[float]:
+    """
+    Root-mean-square relative change per week between consecutive measurements.
+
+    Changes across a gap of n weeks are scaled by 1/sqrt(n), so series sampled
+    at different cadences are comparable.
+
+    Args:
+        points: Measured (week, value) pairs, oldest first
+
+    Returns:
+        float: Weekly volatility, or None with fewer than two measurements
+    """
+    if len(points) < 2:
+        return None
+    squared = []
+    for (week0, value0), (week1, value1) in zip(points, points[1:]):
+        weeks = max((week1 - week0).days / 7, 1.0)
+        squared.append(((value1 - value0) / max(value0, 1)) ** 2 / weeks)
+    return math.sqrt(sum(squared) / len(squared))
+
+
+def series_stats(
+    records: List[Dict[str, Any]], location: str, term: str, week_starting: date
+) -> SeriesStats:
+    """
+    Compute volatility and staleness for one series from its job_counts history.
+
+    Args:
+        records: job_counts rows for the location
+        location: Location string
+        term: Count column
+        week_starting: Week being planned
+
+    Returns:
+        SeriesStats for the series
+    """
+    points = [point for point in measured_points(records, term) if point[0] <= week_starting]
+    if not points:
+        return SeriesStats(location=location, term=term)
+
+    last_week, last_value = points[-1]
+    return SeriesStats(
+        location=location,
+        term=term,
+        volatility=series_volatility(points),
+        last_week=last_week,
+        last_value=last_value,
+        staleness_weeks=(week_starting - last_week).days // 7,
+    )
+
+
+def cycle_budget(monthly_quota: int, cycles_per_month: float = WEEKS_PER_MONTH) -> int:
+    """
+    Share of the monthly SERP quota available to one weekly cycle.
+
+    Args:
+        monthly_quota: SERP searches available per month
+        cycles_per_month: Collection cycles per month
+
+    Returns:
+        int: Number of searches this cycle may spend
+    """
+    return math.floor(monthly_quota / cycles_per_month)
+
+
+def plan_cycle(
+    stats: List[SeriesStats],
+    budget: int,
+    week_starting: date,
+    max_staleness_weeks: int = 8,
+) -> CyclePlan:
+    """
+    Choose which cells to query within the budget.
+
+    Cells never measured, or not measured for max_staleness_weeks, are queried
+    first; the remaining budget goes to the highest-priority cells. Cells
+    already measured this week are never queried again and count against the
+    budget, so re-running a cycle in the same week cannot exceed it. The
+    never-measured terms of a location are planned together, because its row
+    cannot be written until every term has a value: if they do not all fit in
+    the remaining budget, none of them are queried this cycle.
+
+    Args:
+        stats: Statistics for every (location, term) cell
+        budget: Number of searches available for the whole week
+        week_starting: Week being planned
+        max_staleness_weeks: Staleness at which a cell must be refreshed
+
+    Returns:
+        CyclePlan with the cells to query and the cells to carry forward
+    """
+
+    def forced(series: SeriesStats) -> bool:
+        return series.staleness_weeks is None or series.staleness_weeks >= max_staleness_weeks
+
+    def rank(series: SeriesStats) -> Tuple[bool, float, str, str]:
+        return (not forced(series), -series.priority, series.location, series.term)
+
+    current = [series for series in stats if series.staleness_weeks == 0]
+    remaining = max(budget - len(current), 0)
+    if current:
+        logger.info(f"{len(current)} search(es) already made this week; {remaining} left")
+
+    # Group each location's never-measured terms into one all-or-nothing unit
+    units: List[List[SeriesStats]] = []
+    unmeasured: Dict[str, List[SeriesStats]] = {}
+    for series in stats:
+        if series.staleness_weeks == 0:
+            continue
+        if series.last_week is None:
+            unmeasured.setdefault(series.location, []).append(series)
+        else:
+            units.append([series])
+    units.extend(unmeasured.values())
+    units.sort(key=lambda unit: min(rank(series) for series in unit))
+
+    overdue = sum(len(unit) for unit in units if forced(unit[0]))
+    if overdue > remaining:
+        logger.warning(
+            f"{overdue} cell(s) are due for refresh but the budget only covers {remaining}; "
+            "the rest stay carried forward"
+        )
+
+    query: List[SeriesStats] = []
+    skip: List[SeriesStats] = []
+    for unit in units:
+        if len(query) + len(unit) <= remaining:
+            query.extend(unit)
+        else:
+            if unit[0].last_week is None:
+                logger.warning(
+                    f"Not enough budget left to collect all {len(unit)} new term(s) "
+                    f"for {unit[0].location}; deferring it"
+                )
+            skip.extend(unit)
+
+    return CyclePlan(
+        week_starting=week_starting,
+        budget=budget,
+        spent=len(current),
+        query=query,
+        skip=skip + current,
+    )
+
+
+def fill_counts(stats: List[SeriesStats], measured: Dict[str, int]) -> Optional[JobCounts]:
+    """
+    Assemble a location's row from fresh measurements and carried-forward values.
+
+    Args:
+        stats: Statistics for each term of one location
+        measured: Counts fetched this cycle, by term
+
+    Returns:
+        JobCounts with imputed terms flagged, or None if a term has no value at all
+    """
+    values: Dict[str, int] = {}
+    imputed: Dict[str, str] = {}
+    for series in stats:
+        if series.term in measured:
+            values[series.term] = measured[series.term]
+        elif series.last_value is None:
+            return None
+        else:
+            values[series.term] = series.last_value
+            if series.staleness_weeks != 0:
+                imputed[series.term] = CARRIED_FORWARD
+    return JobCounts.from_terms(values, imputed=imputed)
+
+
+def backfill_updates(
+    records: List[Dict[str, Any]], series: SeriesStats, week_starting: date, value: int
+) -> List[Tuple[str, int, Dict[str, str]]]:
+    """
+    Interpolate the weeks that were carried forward since the last measurement.
+
+    Args:
+        records: job_counts rows for the location
+        series: Statistics computed before this cycle's measurement
+        week_starting: Week of the new measurement
+        value: Newly measured count
+
+    Returns:
+        list: (week_starting, interpolated value, updated imputed flags) per row
+    """
+    if series.last_week is None or series.last_value is None:
+        return []
+
+    span = (week_starting - series.last_week).days
+    updates = []
+    for record in records:
+        week = date.fromisoformat(record["week_starting"][:10])
+        imputed = dict(record.get("imputed") or {})
+        if not series.last_week < week < week_starting or series.term not in imputed:
+            continue
+        fraction = (week - series.last_week).days / span
+        estimate = round(series.last_value + (value - series.last_value) * fraction)
+        imputed[series.term] = INTERPOLATED
+        updates.append((week.isoformat(), estimate, imputed))
+    return updates
+
+
+def display_plan(plan: CyclePlan) -> None:
+    """Print a plan in a formatted table."""
+    print()
+    print("=" * 90)
+    print(f"Sampling Plan for Week Starting: {plan.week_starting.isoformat()}")
+    print(
+        f"Budget: {plan.budget} searches, already used this week: {plan.spent}, "
+        f"planned: {len(plan.query)}"
+    )
+    print("-" * 90)
+    print(f"{'Location':<25} {'Term':<22} {'Action':<8} {'Stale (wk)':>10} {'Priority':>10}")
+    print("-" * 90)
+    for action, cells in (("query", plan.query), ("carry", plan.skip)):
+        for series in cells:
+            stale = "-" if series.staleness_weeks is None else str(series.staleness_weeks)
+            priority = "new" if math.isinf(series.priority) else f"{series.priority:.3f}"
+            print(f"{series.location:<25} {series.term:<22} {action:<8} {stale:>10} {priority:>10}")
+    print("=" * 90)
+    print()
+
+
+def run_planned_cycle(config: Config, execute: bool = False) -> CyclePlan:
+    """
+    Plan this week's searches and, if requested, execute the plan.
+
+    Args:
+        config: Application configuration
+        execute: Run the planned searches and save rows (otherwise only print the plan)
+
+    Returns:
+        CyclePlan that was displayed (and executed)
+    """
+    if not config.supabase_url or not config.supabase_key:
+        raise ValueError("Missing Supabase credentials")
+
+    db_client = DatabaseClient(url=config.supabase_url, key=config.supabase_key)
+    week_start = get_week_start()
+    week = week_start.date()
+    terms = search_terms(config.job_title)
+
+    history = {
+        location: db_client.get_latest_counts(location, limit=config.planner_history_weeks)
+        for location in config.locations
+    }
+    stats = {
+        location: [series_stats(history[location], location, term, week) for term in terms]
+        for location in config.locations
+    }
+
+    plan = plan_cycle(
+        [series for location_stats in stats.values() for series in location_stats],
+        budget=cycle_budget(config.serp_monthly_quota),
+        week_starting=week,
+        max_staleness_weeks=config.planner_max_staleness_weeks,
+    )
+    display_plan(plan)
+    if not execute:
+        return plan
+
+    execute_plan(
+        plan,
+        stats,
+        history,
+        serp_client=SerpClient(api_key=config.serp_api_key),
+        db_client=db_client,
+        terms=terms,
+        week_start=week_start,
+    )
+    return plan
+
+
+def execute_plan(
+    plan: CyclePlan,
+    stats: Dict[str, List[SeriesStats]],
+    history: Dict[str, List[Dict[str, Any]]],
+    serp_client: SerpClient,
+    db_client: DatabaseClient,
+    terms: Dict[str, str],
+    week_start: datetime,
+) -> None:
+    """
+    Run a plan's searches, save each location's row and back-fill estimates.
+
+    A cell whose search fails is carried forward like an unplanned cell and is
+    never used to back-fill earlier weeks. A location whose row cannot be saved
+    is logged and skipped, so the other locations are still written.
+
+    Args:
+        plan: Plan produced by plan_cycle
+        stats: Statistics per location, one entry per term
+        history: job_counts rows per location used to compute the statistics
+        serp_client: SERP client used for the planned searches
+        db_client: Database client for saving rows
+        terms: JobCounts field name -> search term
+        week_start: Start of the week being collected
+    """
+    measured: Dict[str, Dict[str, int]] = {location: {} for location in stats}
+    for series in plan.query:
+        try:
+            count = serp_client.get_term_count(terms[series.term], series.location)
+        except Exception as e:
+            # Carry the cell forward rather than storing (and interpolating towards) a zero
+            logger.warning(f"Search failed for {series.term} in {series.location}: {e}")
+            continue
+        measured[series.location][series.term] = count
+
+    failed: List[str] = []
+    for location, location_stats in stats.items():
+        counts = fill_counts(location_stats, measured[location])
+        if counts is None:
+            logger.warning(f"Skipping {location}: a term has never been measured")
+            continue
+        try:
+            save_location(
+                db_client,
+                location,
+                counts,
+                location_stats,
+                measured[location],
+                history[location],
+                week_start,
+            )
+        except Exception as e:
+            # Keep going so the remaining locations' searches are not lost as well
+            logger.error(f"Failed to save {location}: {e}")
+            failed.append(location)
+
+    if failed:
+        logger.error(f"Rows for {len(failed)} location(s) were not saved: {', '.join(failed)}")
+    logger.success(
+        f"Planned cycle complete: {plan.spent + len(plan.query)} of {plan.budget} searches used"
+    )
+
+
+def save_location(
+    db_client: DatabaseClient,
+    location: str,
+    counts: JobCounts,
+    stats: List[SeriesStats],
+    measured: Dict[str, int],
+    records: List[Dict[str, Any]],
+    week_start: datetime,
+) -> None:
+    """
+    Save a location's row and back-fill the weeks carried forward before it.
+
+    Args:
+        db_client: Database client for saving rows
+        location: Location string
+        counts: Row assembled by fill_counts
+        stats: Statistics for each term of the location
+        measured: Counts fetched this cycle, by term
+        records: job_counts rows used to compute the statistics
+        week_start: Start of the week being collected
+    """
+    db_client.save_job_counts(counts=counts, week_starting=week_start, location=location)
+
+    week = week_start.date()
+    by_week = {record["week_starting"][:10]: record for record in records}
+    for series in stats:
+        if series.term not in measured:
+            continue
+        for week_iso, value, imputed in backfill_updates(
+            records, series, week, measured[series.term]
+        ):
+            db_client.update_imputed_count(week_iso, location, series.term, value, imputed)
+            # Keep the cached row in sync so the next term sees these flags
+            by_week[week_iso].update({series.term: value, "imputed": imputed})
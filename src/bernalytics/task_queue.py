@@ -0,0 +1,501 @@
+"""
+Lease-based work queue for distributed collection.
+
+The (location, term, week) matrix is materialized as task rows. Workers claim
+tasks with expiring leases, so several processes or hosts can split the work
+without duplicating SERP calls, and tasks held by a dead worker become
+claimable again once the lease expires. A task is completed at most once: only
+the worker that currently holds the lease can mark it done. Tasks that keep
+losing their lease are marked failed after `max_attempts` claims.
+
+Once every term of a (week, location) group is done, the group is written to
+job_counts and marked saved. Groups that are done but not yet saved stay
+visible through unsaved_groups(), so a save that failed or was interrupted is
+retried by any worker.
+
+Two backends share the same semantics:
+
+- SupabaseTaskQueue: Postgres via Supabase RPC (see sql/task_queue.sql)
+- SQLiteTaskQueue: a local stand-in for single-host runs and tests
+"""
+
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union, cast
+
+from loguru import logger
+
+from bernalytics.database import DatabaseClient
+from bernalytics.models import CollectionTask
+from bernalytics.utils.config import Config
+
+
+class TaskQueue(ABC):
+    """Interface shared by the queue backends."""
+
+    def __init__(self, lease_seconds: int = 300, max_attempts: int = 5) -> None:
+        """
+        Initialize the queue.
+
+        Args:
+            lease_seconds: How long a claimed task stays reserved for its worker
+            max_attempts: Tasks claimed this many times are no longer handed out
+        """
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def enqueue(self, week_starting: datetime, locations: List[str], terms: Dict[str, str]) -> int:
+        """
+        Materialize one task per (location, term) for a week.
+
+        Existing tasks are left untouched, so enqueuing the same week twice is
+        safe; failed tasks for the week are reset so they are tried again.
+
+        Args:
+            week_starting: Start date of the week
+            locations: Locations to collect
+            terms: JobCounts field name -> search term
+
+        Returns:
+            int: Number of newly created tasks
+        """
+
+    @abstractmethod
+    def claim(self, worker_id: str, limit: int = 1) -> List[CollectionTask]:
+        """
+        Lease up to `limit` pending or expired tasks for a worker.
+
+        Args:
+            worker_id: Unique identifier of the claiming worker
+            limit: Maximum number of tasks to claim
+
+        Returns:
+            list: Claimed tasks (empty when nothing is available)
+        """
+
+    @abstractmethod
+    def renew(self, task_id: int, worker_id: str) -> bool:
+        """
+        Extend a task's lease by lease_seconds from now.
+
+        Args:
+            task_id: Task to renew
+            worker_id: Worker that claimed the task
+
+        Returns:
+            bool: False if the lease was lost to another worker
+        """
+
+    @abstractmethod
+    def release(self, task_ids: List[int], worker_id: str) -> int:
+        """
+        Return unstarted tasks to the queue without counting the attempt.
+
+        Args:
+            task_ids: Tasks to release
+            worker_id: Worker that claimed the tasks
+
+        Returns:
+            int: Number of tasks released
+        """
+
+    @abstractmethod
+    def fail_exhausted(self) -> List[CollectionTask]:
+        """
+        Mark expired tasks that have used up max_attempts as failed.
+
+        Returns:
+            list: Tasks that were marked failed by this call
+        """
+
+    @abstractmethod
+    def complete(self, task_id: int, worker_id: str, result_count: int) -> bool:
+        """
+        Mark a task done if the worker still holds its lease.
+
+        Args:
+            task_id: Task to complete
+            worker_id: Worker that claimed the task
+            result_count: Job count returned by the search
+
+        Returns:
+            bool: False if the lease was lost to another worker
+        """
+
+    @abstractmethod
+    def group_results(self, week_starting: str, location: str) -> Optional[Dict[str, int]]:
+        """
+        Collect the results for one (week, location) once every term is done.
+
+        Args:
+            week_starting: Week in ISO format
+            location: Location string
+
+        Returns:
+            dict: JobCounts field name -> count, or None while tasks are outstanding
+        """
+
+    @abstractmethod
+    def unsaved_groups(self, limit: int = 10) -> List[Tuple[str, str]]:
+        """
+        Find (week, location) groups whose tasks are all done but not yet saved.
+
+        Args:
+            limit: Maximum number of groups to return
+
+        Returns:
+            list: (week_starting, location) pairs
+        """
+
+    @abstractmethod
+    def mark_saved(self, week_starting: str, location: str) -> None:
+        """
+        Record that a group's row has been written to job_counts.
+
+        Args:
+            week_starting: Week in ISO format
+            location: Location string
+        """
+
+
+class SQLiteTaskQueue(TaskQueue):
+    """Task queue stored in a local SQLite database."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS collection_tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            week_starting TEXT NOT NULL,
+            location TEXT NOT NULL,
+            term TEXT NOT NULL,
+            search_term TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            lease_owner TEXT,
+            lease_expires_at REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            result_count INTEGER,
+            completed_at REAL,
+            saved_at REAL,
+            UNIQUE (week_starting, location, term)
+        );
+        CREATE INDEX IF NOT EXISTS idx_collection_tasks_status
+            ON collection_tasks(status, lease_expires_at);
+    """
+
+    def __init__(
+        self, path: Union[str, Path], lease_seconds: int = 300, max_attempts: int = 5
+    ) -> None:
+        """
+        Open (and create if needed) the SQLite queue.
+
+        Args:
+            path: Path to the SQLite database file
+            lease_seconds: How long a claimed task stays reserved for its worker
+            max_attempts: Tasks claimed this many times are no longer handed out
+        """
+        super().__init__(lease_seconds=lease_seconds, max_attempts=max_attempts)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; transactions are opened explicitly where needed
+        self.conn = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(self.SCHEMA)
+        logger.info(f"SQLite task queue opened at {path}")
+
+    def enqueue(self, week_starting: datetime, locations: List[str], terms: Dict[str, str]) -> int:
+        rows = [
+            (week_starting.date().isoformat(), location, term, search_term)
+            for location in locations
+            for term, search_term in terms.items()
+        ]
+        before = self.conn.total_changes
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO collection_tasks "
+                "(week_starting, location, term, search_term) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            created = self.conn.total_changes - before
+            requeued = self.conn.execute(
+                "UPDATE collection_tasks SET status = 'pending', attempts = 0, "
+                "lease_owner = NULL, lease_expires_at = NULL "
+                "WHERE status = 'failed' AND week_starting = ? "
+                f"AND location IN ({', '.join('?' for _ in locations)})",
+                (week_starting.date().isoformat(), *locations),
+            ).rowcount
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        logger.info(f"Enqueued {created} new task(s) for week {week_starting.date()}")
+        if requeued:
+            logger.warning(f"Re-queued {requeued} failed task(s) for week {week_starting.date()}")
+        return created
+
+    def claim(self, worker_id: str, limit: int = 1) -> List[CollectionTask]:
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock up front, so concurrent claimers
+        # serialize here instead of both selecting the same rows
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.conn.execute(
+                "SELECT * FROM collection_tasks "
+                "WHERE attempts < ? AND (status = 'pending' "
+                "OR (status = 'leased' AND lease_expires_at < ?)) "
+                "ORDER BY week_starting, id LIMIT ?",
+                (self.max_attempts, now, limit),
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE collection_tasks SET status = 'leased', lease_owner = ?, "
+                "lease_expires_at = ?, attempts = attempts + 1 WHERE id = ?",
+                [(worker_id, now + self.lease_seconds, row["id"]) for row in rows],
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        return [self._task(row, attempts=row["attempts"] + 1) for row in rows]
+
+    def renew(self, task_id: int, worker_id: str) -> bool:
+        cursor = self.conn.execute(
+            "UPDATE collection_tasks SET lease_expires_at = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (time.time() + self.lease_seconds, task_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def release(self, task_ids: List[int], worker_id: str) -> int:
+        cursor = self.conn.executemany(
+            "UPDATE collection_tasks SET status = 'pending', lease_owner = NULL, "
+            "lease_expires_at = NULL, attempts = MAX(attempts - 1, 0) "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            [(task_id, worker_id) for task_id in task_ids],
+        )
+        return cursor.rowcount
+
+    def fail_exhausted(self) -> List[CollectionTask]:
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.conn.execute(
+                "SELECT * FROM collection_tasks WHERE status = 'leased' "
+                "AND lease_expires_at < ? AND attempts >= ?",
+                (time.time(), self.max_attempts),
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE collection_tasks SET status = 'failed', lease_owner = NULL, "
+                "lease_expires_at = NULL WHERE id = ?",
+                [(row["id"],) for row in rows],
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return [self._task(row) for row in rows]
+
+    def complete(self, task_id: int, worker_id: str, result_count: int) -> bool:
+        cursor = self.conn.execute(
+            "UPDATE collection_tasks SET status = 'done', result_count = ?, "
+            "completed_at = ?, lease_expires_at = NULL "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (result_count, time.time(), task_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def group_results(self, week_starting: str, location: str) -> Optional[Dict[str, int]]:
+        rows = self.conn.execute(
+            "SELECT term, status, result_count FROM collection_tasks "
+            "WHERE week_starting = ? AND location = ?",
+            (week_starting, location),
+        ).fetchall()
+        if not rows or any(row["status"] != "done" for row in rows):
+            return None
+        return {row["term"]: row["result_count"] for row in rows}
+
+    def unsaved_groups(self, limit: int = 10) -> List[Tuple[str, str]]:
+        rows = self.conn.execute(
+            "SELECT week_starting, location FROM collection_tasks "
+            "GROUP BY week_starting, location "
+            "HAVING SUM(status != 'done') = 0 AND SUM(saved_at IS NULL) > 0 "
+            "ORDER BY week_starting LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [(row["week_starting"], row["location"]) for row in rows]
+
+    def mark_saved(self, week_starting: str, location: str) -> None:
+        self.conn.execute(
+            "UPDATE collection_tasks SET saved_at = ? WHERE week_starting = ? AND location = ?",
+            (time.time(), week_starting, location),
+        )
+
+    @staticmethod
+    def _task(row: sqlite3.Row, attempts: Optional[int] = None) -> CollectionTask:
+        return CollectionTask(
+            id=row["id"],
+            week_starting=row["week_starting"],
+            location=row["location"],
+            term=row["term"],
+            search_term=row["search_term"],
+            attempts=row["attempts"] if attempts is None else attempts,
+        )
+
+
+class SupabaseTaskQueue(TaskQueue):
+    """Task queue stored in Postgres, accessed through Supabase RPC functions."""
+
+    def __init__(
+        self, db_client: DatabaseClient, lease_seconds: int = 300, max_attempts: int = 5
+    ) -> None:
+        """
+        Initialize the Supabase queue.
+
+        Args:
+            db_client: Database client whose Supabase connection is reused
+            lease_seconds: How long a claimed task stays reserved for its worker
+            max_attempts: Tasks claimed this many times are no longer handed out
+        """
+        super().__init__(lease_seconds=lease_seconds, max_attempts=max_attempts)
+        self.client = db_client.client
+
+    def enqueue(self, week_starting: datetime, locations: List[str], terms: Dict[str, str]) -> int:
+        rows = [
+            {
+                "week_starting": week_starting.date().isoformat(),
+                "location": location,
+                "term": term,
+                "search_term": search_term,
+            }
+            for location in locations
+            for term, search_term in terms.items()
+        ]
+        try:
+            response = (
+                self.client.table("collection_tasks")
+                .upsert(rows, on_conflict="week_starting,location,term", ignore_duplicates=True)
+                .execute()
+            )
+        except Exception as e:
+            logger.error(f"Failed to enqueue collection tasks: {e}")
+            raise
+        created = len(response.data or [])
+        requeued = (
+            self.client.table("collection_tasks")
+            .update({"status": "pending", "attempts": 0})
+            .eq("week_starting", week_starting.date().isoformat())
+            .eq("status", "failed")
+            .in_("location", locations)
+            .execute()
+        )
+        logger.info(f"Enqueued {created} new task(s) for week {week_starting.date()}")
+        if requeued.data:
+            logger.warning(
+                f"Re-queued {len(requeued.data)} failed task(s) for week {week_starting.date()}"
+            )
+        return created
+
+    def claim(self, worker_id: str, limit: int = 1) -> List[CollectionTask]:
+        response = self.client.rpc(
+            "claim_collection_tasks",
+            {
+                "p_worker_id": worker_id,
+                "p_lease_seconds": self.lease_seconds,
+                "p_limit": limit,
+                "p_max_attempts": self.max_attempts,
+            },
+        ).execute()
+        return [CollectionTask.model_validate(row) for row in self._rows(response.data)]
+
+    def renew(self, task_id: int, worker_id: str) -> bool:
+        response = self.client.rpc(
+            "renew_collection_task",
+            {
+                "p_task_id": task_id,
+                "p_worker_id": worker_id,
+                "p_lease_seconds": self.lease_seconds,
+            },
+        ).execute()
+        return bool(response.data)
+
+    def release(self, task_ids: List[int], worker_id: str) -> int:
+        response = self.client.rpc(
+            "release_collection_tasks",
+            {"p_task_ids": task_ids, "p_worker_id": worker_id},
+        ).execute()
+        return int(cast(int, response.data or 0))
+
+    def fail_exhausted(self) -> List[CollectionTask]:
+        response = self.client.rpc(
+            "fail_exhausted_collection_tasks", {"p_max_attempts": self.max_attempts}
+        ).execute()
+        return [CollectionTask.model_validate(row) for row in self._rows(response.data)]
+
+    def complete(self, task_id: int, worker_id: str, result_count: int) -> bool:
+        response = self.client.rpc(
+            "complete_collection_task",
+            {"p_task_id": task_id, "p_worker_id": worker_id, "p_result_count": result_count},
+        ).execute()
+        return bool(response.data)
+
+    def group_results(self, week_starting: str, location: str) -> Optional[Dict[str, int]]:
+        response = (
+            self.client.table("collection_tasks")
+            .select("term,status,result_count")
+            .eq("week_starting", week_starting)
+            .eq("location", location)
+            .execute()
+        )
+        rows = self._rows(response.data)
+        if not rows or any(row["status"] != "done" for row in rows):
+            return None
+        return {str(row["term"]): int(row["result_count"]) for row in rows}
+
+    def unsaved_groups(self, limit: int = 10) -> List[Tuple[str, str]]:
+        response = self.client.rpc("unsaved_collection_groups", {"p_limit": limit}).execute()
+        return [
+            (str(row["week_starting"]), str(row["location"])) for row in self._rows(response.data)
+        ]
+
+    def mark_saved(self, week_starting: str, location: str) -> None:
+        (
+            self.client.table("collection_tasks")
+            .update({"saved_at": datetime.utcnow().isoformat()})
+            .eq("week_starting", week_starting)
+            .eq("location", location)
+            .execute()
+        )
+
+    @staticmethod
+    def _rows(data: Any) -> List[Dict[str, Any]]:
+        return cast(List[Dict[str, Any]], data or [])
+
+
+def create_task_queue(config: Config, db_client: Optional[DatabaseClient] = None) -> TaskQueue:
+    """
+    Build the task queue selected by QUEUE_BACKEND.
+
+    Args:
+        config: Application configuration
+        db_client: Existing database client to reuse for the Supabase backend
+
+    Returns:
+        TaskQueue: SQLite or Supabase backed queue
+    """
+    if config.queue_backend == "sqlite":
+        return SQLiteTaskQueue(
+            config.queue_path,
+            lease_seconds=config.queue_lease_seconds,
+            max_attempts=config.queue_max_attempts,
+        )
+
+    if db_client is None:
+        if not config.supabase_url or not config.supabase_key:
+            raise ValueError("Missing Supabase credentials")
+        db_client = DatabaseClient(url=config.supabase_url, key=config.supabase_key)
+    return SupabaseTaskQueue(
+        db_client,
+        lease_seconds=config.queue_lease_seconds,
+        max_attempts=config.queue_max_attempts,
+    )
@@ -7,7 +7,7 @@ from environment variables and configuration files.
 
 import os
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
 from loguru import logger
@@ -23,6 +23,7 @@ class Config(BaseSettings):
 
     # Search Parameters
     location: str = Field(default="Berlin, Germany", validation_alias="LOCATION")
+    location_list: Optional[str] = Field(default=None, validation_alias="LOCATIONS")
     job_title: str = Field(default="Data Engineer", validation_alias="JOB_TITLE")
     time_period: str = Field(default="week", validation_alias="TIME_PERIOD")
 
@@ -47,6 +48,13 @@ class Config(BaseSettings):
     max_pages: int = Field(default=10, validation_alias="MAX_PAGES")
     request_delay_seconds: float = Field(default=1.0, validation_alias="REQUEST_DELAY_SECONDS")
 
+    # Adaptive Sampling Planner
+    serp_monthly_quota: int = Field(default=100, ge=0, validation_alias="SERP_MONTHLY_QUOTA")
+    planner_max_staleness_weeks: int = Field(
+        default=8, gt=0, validation_alias="PLANNER_MAX_STALENESS_WEEKS"
+    )
+    planner_history_weeks: int = Field(default=26, gt=1, validation_alias="PLANNER_HISTORY_WEEKS")
+
     # Database (Optional - for future use)
     database_url: Optional[str] = Field(default=None, validation_alias="DATABASE_URL")
 
@@ -54,6 +62,20 @@ class Config(BaseSettings):
     supabase_url: Optional[str] = Field(default=None, validation_alias="SUPABASE_URL")
     supabase_key: Optional[str] = Field(default=None, validation_alias="SUPABASE_KEY")
 
+    # Daemon Configuration
+    daemon_jitter_fraction: float = Field(
+        default=0.1, ge=0, lt=1, validation_alias="DAEMON_JITTER_FRACTION"
+    )
+    daemon_host: str = Field(default="127.0.0.1", validation_alias="DAEMON_HOST")
+    daemon_port: int = Field(default=8787, ge=0, le=65535, validation_alias="DAEMON_PORT")
+
+    # Distributed Collection Queue
+    queue_backend: str = Field(default="sqlite", validation_alias="QUEUE_BACKEND")
+    queue_path: Path = Field(default=Path("./data/queue.sqlite3"), validation_alias="QUEUE_PATH")
+    queue_lease_seconds: int = Field(default=300, gt=0, validation_alias="QUEUE_LEASE_SECONDS")
+    queue_max_attempts: int = Field(default=5, gt=0, validation_alias="QUEUE_MAX_ATTEMPTS")
+    worker_id: Optional[str] = Field(default=None, validation_alias="WORKER_ID")
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -70,6 +92,15 @@ class Config(BaseSettings):
             raise ValueError(f"time_period must be one of {allowed}, got '{v}'")
         return v.lower()
 
+    @field_validator("queue_backend")
+    @classmethod
+    def validate_queue_backend(cls, v: str) -> str:
+        """Validate queue backend is supported."""
+        allowed = ["sqlite", "supabase"]
+        if v.lower() not in allowed:
+            raise ValueError(f"queue_backend must be one of {allowed}, got '{v}'")
+        return v.lower()
+
     @field_validator("log_level")
     @classmethod
     def validate_log_level(cls, v: str) -> str:
@@ -87,11 +118,25 @@ class Config(BaseSettings):
             v.mkdir(parents=True, exist_ok=True)
         return v
 
+    @property
+    def locations(self) -> List[str]:
+        """
+        Locations collected by the daemon, the queue (enqueue) and the planner.
+
+        LOCATIONS is separated by semicolons because location strings
+        themselves contain commas (e.g. "Berlin, Germany; Munich, Germany").
+        Falls back to the single LOCATION setting when unset.
+        """
+        if not self.location_list:
+            return [self.location]
+        return [loc.strip() for loc in self.location_list.split(";") if loc.strip()]
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert configuration to dictionary."""
         return {
             "serp_api_key": "***" if self.serp_api_key else None,  # Mask API key
             "location": self.location,
+            "locations": self.locations,
             "job_title": self.job_title,
             "time_period": self.time_period,
             "employment_type": self.employment_type,
@@ -105,9 +150,20 @@ class Config(BaseSettings):
             "max_results_per_page": self.max_results_per_page,
             "max_pages": self.max_pages,
             "request_delay_seconds": self.request_delay_seconds,
+            "serp_monthly_quota": self.serp_monthly_quota,
+            "planner_max_staleness_weeks": self.planner_max_staleness_weeks,
+            "planner_history_weeks": self.planner_history_weeks,
             "database_url": "***" if self.database_url else None,  # Mask DB URL
             "supabase_url": "***" if self.supabase_url else None,  # Mask Supabase URL
             "supabase_key": "***" if self.supabase_key else None,  # Mask Supabase key
+            "daemon_jitter_fraction": self.daemon_jitter_fraction,
+            "daemon_host": self.daemon_host,
+            "daemon_port": self.daemon_port,
+            "queue_backend": self.queue_backend,
+            "queue_path": str(self.queue_path),
+            "queue_lease_seconds": self.queue_lease_seconds,
+            "queue_max_attempts": self.queue_max_attempts,
+            "worker_id": self.worker_id,
         }
 
 
@@ -6,7 +6,7 @@ This script retrieves and displays job count data from the Supabase database.
 
 import os
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from dotenv import load_dotenv
 from loguru import logger
@@ -23,6 +23,12 @@ def format_date(date_str: str) -> str:
         return date_str
 
 
+def format_count(record: Dict[str, Any], term: str) -> str:
+    """Format a count, marking values that were estimated rather than measured."""
+    value = record.get(term, 0)
+    return f"{value}*" if term in (record.get("imputed") or {}) else str(value)
+
+
 def display_data(records: list, location: str) -> None:
     """Display job count records in a formatted table."""
     if not records:
@@ -46,10 +52,14 @@ def display_data(records: list, location: str) -> None:
         total = de + jr + sr
         collected = format_date(record.get("collected_at", ""))
 
-        print(f"{week:<15} {de:>15} {jr:>10} {sr:>10} {total:>10} {collected:<20}")
+        de_str = format_count(record, "data_engineer")
+        jr_str = format_count(record, "junior_data_engineer")
+        sr_str = format_count(record, "senior_data_engineer")
+
+        print(f"{week:<15} {de_str:>15} {jr_str:>10} {sr_str:>10} {total:>10} {collected:<20}")
 
     print("=" * 100)
-    print(f"Total records: {len(records)}")
+    print(f"Total records: {len(records)} (* = estimated, not measured)")
     print()
 
 
@@ -0,0 +1,231 @@
+"""
+Queue worker for distributed collection.
+
+Each worker claims (location, term, week) tasks from the shared task queue,
+runs one SERP search per task and completes it under its lease. The worker
+that completes the last outstanding term for a (location, week) writes the
+assembled row to job_counts; rows whose save failed are picked up again by
+any idle worker.
+"""
+
+import os
+import signal
+import socket
+import threading
+from datetime import datetime
+from typing import Optional
+
+from loguru import logger
+
+from bernalytics.api.serp_client import SerpClient, search_terms
+from bernalytics.database import DatabaseClient
+from bernalytics.main import get_week_start
+from bernalytics.models import CollectionTask, JobCounts
+from bernalytics.task_queue import TaskQueue, create_task_queue
+from bernalytics.utils.config import Config
+
+
+def default_worker_id() -> str:
+    """Build a worker identifier that is unique per process and host."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class CollectionWorker:
+    """Claims tasks from a TaskQueue and executes them until the queue drains or stop()."""
+
+    def __init__(
+        self,
+        queue: TaskQueue,
+        serp_client: SerpClient,
+        db_client: Optional[DatabaseClient] = None,
+        worker_id: Optional[str] = None,
+        batch_size: int = 1,
+        poll_seconds: float = 30.0,
+    ) -> None:
+        """
+        Initialize the worker.
+
+        Args:
+            queue: Task queue to claim work from
+            serp_client: SERP client used for each search
+            db_client: Database client for finished rows (None only logs them)
+            worker_id: Unique worker identifier (defaults to host and PID)
+            batch_size: Number of tasks claimed per round trip
+            poll_seconds: Wait between claims when the queue is empty
+        """
+        self.queue = queue
+        self.serp_client = serp_client
+        self.db_client = db_client
+        self.worker_id = worker_id or default_worker_id()
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """Request a graceful shutdown after the task in progress."""
+        self._stop.set()
+
+    def run(self, exit_when_empty: bool = False) -> int:
+        """
+        Process tasks until stopped.
+
+        Args:
+            exit_when_empty: Return as soon as no task can be claimed
+
+        Returns:
+            int: Number of tasks completed by this worker
+        """
+        self._install_signal_handlers()
+        logger.info(f"Worker {self.worker_id} started")
+
+        completed = 0
+        while not self._stop.is_set():
+            tasks = self.queue.claim(self.worker_id, limit=self.batch_size)
+            if not tasks:
+                self.sweep()
+                if exit_when_empty:
+                    break
+                self._stop.wait(self.poll_seconds)
+                continue
+
+            for index, task in enumerate(tasks):
+                if self._stop.is_set():
+                    unstarted = [t.id for t in tasks[index:]]
+                    released = self.queue.release(unstarted, self.worker_id)
+                    logger.info(f"Released {released} unstarted task(s) on shutdown")
+                    break
+                # The claim started every lease at once; refresh it before each later task
+                if index > 0 and not self.queue.renew(task.id, self.worker_id):
+                    logger.warning(f"Lease expired for task {task.id} before it was started")
+                    continue
+                try:
+                    if self.process(task):
+                        completed += 1
+                except Exception as e:
+                    # The lease expires and another worker (or this one) retries the task
+                    logger.error(f"Task {task.id} failed: {e}")
+
+        logger.info(f"Worker {self.worker_id} stopped after completing {completed} task(s)")
+        return completed
+
+    def process(self, task: CollectionTask) -> bool:
+        """
+        Execute a single task and complete it under the worker's lease.
+
+        Args:
+            task: Claimed task
+
+        Returns:
+            bool: True if this worker completed the task
+        """
+        count = self.serp_client.get_term_count(task.search_term, task.location)
+
+        if not self.queue.complete(task.id, self.worker_id, count):
+            logger.warning(f"Lease lost for task {task.id}; result discarded")
+            return False
+
+        self.save_group(task.week_starting, task.location)
+        return True
+
+    def sweep(self) -> None:
+        """Report exhausted tasks and retry saves that failed or were interrupted."""
+        for task in self.queue.fail_exhausted():
+            logger.error(
+                f"Task {task.id} ({task.location}, {task.term}, week {task.week_starting}) "
+                f"failed after {task.attempts} attempt(s); re-run enqueue to retry"
+            )
+        if self.db_client is None:
+            return
+        for week_starting, location in self.queue.unsaved_groups():
+            self.save_group(week_starting, location)
+
+    def save_group(self, week_starting: str, location: str) -> bool:
+        """
+        Write a (week, location) row once all of its terms are done.
+
+        Args:
+            week_starting: Week in ISO format
+            location: Location string
+
+        Returns:
+            bool: True if the row was written and marked saved
+        """
+        results = self.queue.group_results(week_starting, location)
+        if results is None:
+            return False
+
+        counts = JobCounts.from_terms(results)
+        if self.db_client is None:
+            logger.info(f"Week {week_starting} in {location} complete: {counts}")
+            return False
+
+        try:
+            # Upsert is keyed on (week_starting, location), so a repeat write is harmless
+            self.db_client.save_job_counts(
+                counts=counts,
+                week_starting=datetime.fromisoformat(week_starting),
+                location=location,
+            )
+        except Exception as e:
+            logger.error(f"Failed to save week {week_starting} in {location}; will retry: {e}")
+            return False
+
+        self.queue.mark_saved(week_starting, location)
+        return True
+
+    def _install_signal_handlers(self) -> None:
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda signum, frame: self.stop())
+
+
+def enqueue_week(config: Config, week_starting: Optional[datetime] = None) -> int:
+    """
+    Materialize the (location, term) tasks for a week.
+
+    Args:
+        config: Application configuration
+        week_starting: Any date in the week to enqueue (defaults to the current week)
+
+    Returns:
+        int: Number of newly created tasks
+    """
+    queue = create_task_queue(config)
+    # Tasks and job_counts rows are keyed on the Monday of the week
+    return queue.enqueue(
+        week_starting=get_week_start(week_starting),
+        locations=config.locations,
+        terms=search_terms(config.job_title),
+    )
+
+
+def run_worker(
+    config: Config, exit_when_empty: bool = False, batch_size: int = 1, write_to_db: bool = True
+) -> int:
+    """
+    Run a queue worker until interrupted (or until the queue is empty).
+
+    Args:
+        config: Application configuration
+        exit_when_empty: Return as soon as no task can be claimed
+        batch_size: Number of tasks claimed per round trip
+        write_to_db: Save finished rows to Supabase
+
+    Returns:
+        int: Number of tasks completed by this worker
+    """
+    db_client = None
+    if write_to_db:
+        if not config.supabase_url or not config.supabase_key:
+            raise ValueError("Missing Supabase credentials")
+        db_client = DatabaseClient(url=config.supabase_url, key=config.supabase_key)
+
+    worker = CollectionWorker(
+        queue=create_task_queue(config, db_client=db_client),
+        serp_client=SerpClient(api_key=config.serp_api_key),
+        db_client=db_client,
+        worker_id=config.worker_id,
+        batch_size=batch_size,
+    )
+    return worker.run(exit_when_empty=exit_when_empty)
@@ -0,0 +1,79 @@
+"""
+Shared stubs for the SERP and Supabase clients.
+"""
+
+import pytest
+
+from bernalytics.api.serp_client import search_terms
+from bernalytics.models import JobCounts
+
+
+class FakeSerpClient:
+    """SERP client stub that returns len(term) for every search and records each call."""
+
+    def __init__(self):
+        self.calls = []
+        self.collected = []
+        self.fail_for = set()
+        self.on_call = None
+
+    def get_term_count(self, term, location):
+        self.calls.append((location, term))
+        if self.on_call:
+            self.on_call(location, term)
+        if term in self.fail_for or location in self.fail_for:
+            raise RuntimeError("search failed")
+        return len(term)
+
+    def get_job_counts(
+        self, job_title="Data Engineer", location="Berlin, Germany", time_period="week"
+    ):
+        self.collected.append(location)
+        return JobCounts.from_terms(
+            {
+                field: self.get_term_count(term, location)
+                for field, term in search_terms(job_title).items()
+            }
+        )
+
+
+class FakeDatabaseClient:
+    """Database client stub that keeps job_counts rows in memory."""
+
+    def __init__(self):
+        self.saved = []
+        self.history = {}
+        self.fail_for = set()
+        self.failures = 0
+
+    def save_job_counts(self, counts, week_starting, location):
+        if self.failures or location in self.fail_for:
+            self.failures = max(self.failures - 1, 0)
+            raise RuntimeError("upsert failed")
+        self.saved.append((location, week_starting, counts))
+        week = week_starting.date().isoformat()
+        records = [r for r in self.history.get(location, []) if r["week_starting"] != week]
+        records.append({"week_starting": week, **counts.model_dump()})
+        self.history[location] = sorted(records, key=lambda r: r["week_starting"], reverse=True)
+
+    def update_imputed_count(self, week_starting, location, term, value, imputed):
+        for record in self.history.get(location, []):
+            if record["week_starting"] == week_starting:
+                record.update({term: value, "imputed": imputed})
+
+    def get_latest_counts(self, location, limit=10):
+        return self.history.get(location, [])[:limit]
+
+    def saved_counts(self, location):
+        """Return the last row saved for a location."""
+        return next(counts for loc, _, counts in reversed(self.saved) if loc == location)
+
+
+@pytest.fixture
+def serp_client():
+    return FakeSerpClient()
+
+
+@pytest.fixture
+def db_client():
+    return FakeDatabaseClient()
@@ -0,0 +1,149 @@
+"""
+Tests for the collector daemon scheduler.
+"""
+
+import json
+import random
+import threading
+import urllib.request
+from datetime import datetime, timedelta
+
+import pytest
+
+from bernalytics.daemon import CollectorDaemon, DaemonMetrics
+
+
+class FakeClock:
+    """Controllable wall clock."""
+
+    def __init__(self, start):
+        self.now = start.timestamp()
+
+    def __call__(self):
+        return self.now
+
+
+def make_daemon(serp, db, locations, **kwargs):
+    kwargs.setdefault("jitter_fraction", 0.0)
+    kwargs.setdefault("port", 0)
+    return CollectorDaemon(serp_client=serp, db_client=db, locations=locations, **kwargs)
+
+
+def test_requires_locations(serp_client, db_client):
+    """Test that a daemon without locations is rejected."""
+    with pytest.raises(ValueError):
+        make_daemon(serp_client, db_client, [])
+
+
+def test_collect_records_success_and_failure(serp_client, db_client):
+    """Test that collection outcomes are reflected in metrics."""
+    db_client.fail_for = {"Munich, Germany"}
+    daemon = make_daemon(serp_client, db_client, ["Berlin, Germany", "Munich, Germany"])
+
+    daemon.collect("Berlin, Germany")
+    daemon.collect("Munich, Germany")
+
+    snapshot = daemon.metrics.snapshot()["locations"]
+    assert [location for location, _, _ in db_client.saved] == ["Berlin, Germany"]
+    assert snapshot["Berlin, Germany"]["failures"] == 0
+    assert snapshot["Munich, Germany"]["failures"] == 1
+    assert snapshot["Munich, Germany"]["last_error"] == "upsert failed"
+
+
+def test_stop_mid_batch_finishes_in_flight_location(serp_client, db_client):
+    """Test that a shutdown during a batch skips the remaining locations."""
+    locations = ["Berlin, Germany", "Munich, Germany", "Hamburg, Germany"]
+    daemon = make_daemon(serp_client, db_client, locations)
+    serp_client.on_call = lambda location, term: daemon.stop()
+
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert serp_client.collected == ["Berlin, Germany"]
+    assert [location for location, _, _ in db_client.saved] == ["Berlin, Germany"]
+
+
+def test_every_week_collected_exactly_once(serp_client, db_client):
+    """Test that jittered runs never skip or repeat a Monday-based week."""
+    random.seed(7)
+    locations = ["Berlin, Germany", "Munich, Germany", "Hamburg, Germany"]
+    # Start late on a Sunday, the worst case for a drifting cadence
+    clock = FakeClock(datetime(2025, 11, 16, 23, 0))
+    daemon = make_daemon(serp_client, db_client, locations, jitter_fraction=0.9, clock=clock)
+
+    daemon.schedule_all()
+    while daemon._queue[0][0] < datetime(2026, 6, 1).timestamp():
+        clock.now = max(clock.now, daemon._queue[0][0])
+        daemon._run_batch(daemon._pop_due())
+
+    expected = [datetime(2025, 11, 10) + timedelta(weeks=i) for i in range(29)]
+    for location in locations:
+        weeks = [week for loc, week, _ in db_client.saved if loc == location]
+        assert weeks == expected
+
+
+def test_already_collected_week_is_skipped_on_start(serp_client, db_client):
+    """Test that a restart does not re-collect a week that is already stored."""
+    clock = FakeClock(datetime(2025, 11, 19, 12, 0))
+    db_client.history = {"Berlin, Germany": [{"week_starting": "2025-11-17"}]}
+    locations = ["Berlin, Germany", "Munich, Germany"]
+    daemon = make_daemon(serp_client, db_client, locations, clock=clock)
+
+    daemon.schedule_all()
+    daemon._run_batch(daemon._pop_due())
+
+    assert serp_client.collected == ["Munich, Germany"]
+    assert min(due for due, _ in daemon._queue) >= datetime(2025, 11, 24).timestamp()
+
+
+def test_failed_collection_is_retried_within_the_week(serp_client, db_client):
+    """Test that a failure is retried before the next week starts."""
+    clock = FakeClock(datetime(2025, 11, 17, 9, 0))
+    db_client.fail_for = {"Berlin, Germany"}
+    daemon = make_daemon(serp_client, db_client, ["Berlin, Germany"], clock=clock)
+
+    daemon.schedule_all()
+    daemon._run_batch(daemon._pop_due())
+
+    due_at, _ = daemon._queue[0]
+    assert due_at == clock.now + daemon.retry_seconds
+
+
+def test_failed_search_is_recorded_and_retried(serp_client, db_client):
+    """Test that a SERP failure is counted as a failure and never stored as zeros."""
+    clock = FakeClock(datetime(2025, 11, 17, 9, 0))
+    serp_client.fail_for = {"Senior Data Engineer"}
+    daemon = make_daemon(serp_client, db_client, ["Berlin, Germany"], clock=clock)
+
+    daemon.schedule_all()
+    daemon._run_batch(daemon._pop_due())
+
+    assert db_client.saved == []
+    assert daemon.metrics.snapshot()["locations"]["Berlin, Germany"]["failures"] == 1
+    assert daemon._queue[0][0] == clock.now + daemon.retry_seconds
+
+
+def test_health_endpoint_serves_metrics(serp_client, db_client):
+    """Test the health and metrics endpoints."""
+    daemon = make_daemon(serp_client, db_client, ["Berlin, Germany"])
+    daemon.metrics.record("Berlin, Germany")
+    daemon._start_server()
+    try:
+        base = f"http://127.0.0.1:{daemon.port}"
+        with urllib.request.urlopen(f"{base}/healthz") as response:
+            assert json.load(response) == {"status": "ok"}
+        with urllib.request.urlopen(f"{base}/metrics") as response:
+            body = response.read().decode()
+        assert 'bernalytics_collection_runs_total{location="Berlin, Germany"} 1' in body
+    finally:
+        daemon._stop_server()
+
+
+def test_prometheus_escapes_labels():
+    """Test that quotes in location names are escaped."""
+    metrics = DaemonMetrics()
+    metrics.record('Odd "Place"')
+
+    assert 'location="Odd \\"Place\\""' in metrics.to_prometheus()
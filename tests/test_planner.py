@@ -0,0 +1,256 @@
+"""
+Tests for the quota-aware sampling planner.
+"""
+
+import math
+from datetime import date, datetime
+
+import pytest
+
+from bernalytics.planner import (
+    CARRIED_FORWARD,
+    INTERPOLATED,
+    SeriesStats,
+    backfill_updates,
+    cycle_budget,
+    execute_plan,
+    fill_counts,
+    plan_cycle,
+    series_stats,
+    series_volatility,
+)
+
+WEEK = date(2025, 11, 17)
+TERMS = {
+    "data_engineer": "Data Engineer",
+    "junior_data_engineer": "Junior Data Engineer",
+    "senior_data_engineer": "Senior Data Engineer",
+}
+
+
+def record(week, de=100, jr=10, sr=50, imputed=None):
+    return {
+        "week_starting": week,
+        "data_engineer": de,
+        "junior_data_engineer": jr,
+        "senior_data_engineer": sr,
+        "imputed": imputed or {},
+    }
+
+
+def test_volatility_scales_with_gap():
+    """Test that a change over n weeks counts as 1/sqrt(n) of a weekly change."""
+    weekly = series_volatility([(date(2025, 1, 6), 100), (date(2025, 1, 13), 110)])
+    four_weeks = series_volatility([(date(2025, 1, 6), 100), (date(2025, 2, 3), 110)])
+
+    assert weekly == pytest.approx(0.1)
+    assert four_weeks == pytest.approx(0.05)
+    assert series_volatility([(date(2025, 1, 6), 100)]) is None
+
+
+def test_series_stats_ignores_imputed_values():
+    """Test that carried-forward rows do not count as measurements."""
+    records = [
+        record("2025-11-03", de=100),
+        record("2025-11-10", de=100, imputed={"data_engineer": CARRIED_FORWARD}),
+    ]
+
+    stats = series_stats(records, "Berlin, Germany", "data_engineer", WEEK)
+
+    assert stats.last_week == date(2025, 11, 3)
+    assert stats.staleness_weeks == 2
+    assert stats.volatility is None
+
+
+def test_unmeasured_series_has_infinite_priority():
+    """Test that series without history are always planned first."""
+    stats = series_stats([], "Munich, Germany", "data_engineer", WEEK)
+
+    assert math.isinf(stats.priority)
+
+
+def test_cycle_budget():
+    """Test splitting the monthly quota into weekly cycles."""
+    assert cycle_budget(100) == 23
+    assert cycle_budget(0) == 0
+
+
+def test_plan_respects_budget_and_priority():
+    """Test that the budget goes to forced cells first, then to volatile cells."""
+    stats = [
+        SeriesStats("Berlin", "data_engineer", 0.5, date(2025, 11, 10), 100, 1),
+        SeriesStats("Berlin", "junior_data_engineer", 0.01, date(2025, 11, 10), 10, 1),
+        SeriesStats("Munich", "data_engineer", 0.01, date(2025, 9, 1), 80, 11),
+        SeriesStats("Hamburg", "data_engineer"),
+        SeriesStats("Berlin", "senior_data_engineer", 0.9, WEEK, 50, 0),
+    ]
+
+    plan = plan_cycle(stats, budget=4, week_starting=WEEK, max_staleness_weeks=8)
+
+    assert plan.spent == 1
+    assert [(s.location, s.term) for s in plan.query] == [
+        ("Hamburg", "data_engineer"),
+        ("Munich", "data_engineer"),
+        ("Berlin", "data_engineer"),
+    ]
+    assert {(s.location, s.term) for s in plan.skip} == {
+        ("Berlin", "junior_data_engineer"),
+        ("Berlin", "senior_data_engineer"),
+    }
+
+
+def test_fill_counts_flags_carried_forward_terms():
+    """Test that unmeasured terms are carried forward and flagged."""
+    stats = [
+        SeriesStats("Berlin", "data_engineer", 0.1, date(2025, 11, 10), 100, 1),
+        SeriesStats("Berlin", "junior_data_engineer", 0.1, date(2025, 11, 10), 10, 1),
+        SeriesStats("Berlin", "senior_data_engineer", 0.1, WEEK, 50, 0),
+    ]
+
+    counts = fill_counts(stats, {"data_engineer": 120})
+
+    assert counts.data_engineer == 120
+    assert counts.junior_data_engineer == 10
+    assert counts.senior_data_engineer == 50
+    assert counts.imputed == {"junior_data_engineer": CARRIED_FORWARD}
+
+
+def test_fill_counts_without_any_value():
+    """Test that a row is not written when a term has never been measured."""
+    assert fill_counts([SeriesStats("Berlin", "data_engineer")], {}) is None
+
+
+def test_backfill_interpolates_carried_forward_weeks():
+    """Test linear interpolation between the last and the new measurement."""
+    records = [
+        record("2025-10-27", de=100),
+        record("2025-11-03", de=100, imputed={"data_engineer": CARRIED_FORWARD}),
+        record(
+            "2025-11-10",
+            de=100,
+            imputed={"data_engineer": CARRIED_FORWARD, "junior_data_engineer": CARRIED_FORWARD},
+        ),
+    ]
+    stats = series_stats(records, "Berlin", "data_engineer", WEEK)
+
+    updates = backfill_updates(records, stats, WEEK, 130)
+
+    assert updates == [
+        ("2025-11-03", 110, {"data_engineer": INTERPOLATED}),
+        (
+            "2025-11-10",
+            120,
+            {"data_engineer": INTERPOLATED, "junior_data_engineer": CARRIED_FORWARD},
+        ),
+    ]
+
+
+def _new_and_stale_locations():
+    history = {
+        "Berlin": [record("2025-10-27"), record("2025-11-03", de=110)],
+        "Leipzig": [],
+    }
+    stats = {
+        location: [series_stats(records, location, term, WEEK) for term in TERMS]
+        for location, records in history.items()
+    }
+    return history, stats
+
+
+@pytest.mark.parametrize("budget", [1, 2])
+def test_new_location_is_not_partially_queried(budget):
+    """Test that a new location's terms are never spent on unless they all fit."""
+    _, stats = _new_and_stale_locations()
+
+    plan = plan_cycle(
+        [series for cells in stats.values() for series in cells], budget=budget, week_starting=WEEK
+    )
+
+    assert len(plan.query) == budget
+    assert all(series.location == "Berlin" for series in plan.query)
+
+
+def test_partial_budget_saves_new_location(serp_client, db_client):
+    """Test that a budget covering a new location but not everything still saves it."""
+    history, stats = _new_and_stale_locations()
+    plan = plan_cycle(
+        [series for cells in stats.values() for series in cells], budget=4, week_starting=WEEK
+    )
+
+    execute_plan(
+        plan, stats, history, serp_client, db_client, terms=TERMS, week_start=datetime(2025, 11, 17)
+    )
+
+    assert len(serp_client.calls) == 4
+    assert db_client.saved_counts("Leipzig").data_engineer == len("Data Engineer")
+    assert db_client.saved_counts("Leipzig").imputed == {}
+    assert len(db_client.saved_counts("Berlin").imputed) == 2
+
+
+def test_rerun_in_same_week_makes_no_searches(serp_client, db_client):
+    """Test that searches already made this week count against the weekly budget."""
+    history, _ = _new_and_stale_locations()
+    db_client.history = {location: list(records) for location, records in history.items()}
+
+    for _ in range(3):
+        history = {location: db_client.get_latest_counts(location) for location in history}
+        stats = {
+            location: [series_stats(records, location, term, WEEK) for term in TERMS]
+            for location, records in history.items()
+        }
+        plan = plan_cycle(
+            [series for cells in stats.values() for series in cells], budget=4, week_starting=WEEK
+        )
+        execute_plan(
+            plan,
+            stats,
+            history,
+            serp_client,
+            db_client,
+            terms=TERMS,
+            week_start=datetime(2025, 11, 17),
+        )
+
+    assert len(serp_client.calls) == 4
+    assert plan.spent == 4
+    assert plan.query == []
+
+
+def test_failed_search_is_carried_forward(serp_client, db_client):
+    """Test that a failed search neither stores a zero nor rewrites carried-forward weeks."""
+    history = {
+        "Berlin": [
+            record("2025-11-10", de=100, imputed={"data_engineer": CARRIED_FORWARD}),
+            record("2025-11-03", de=100),
+        ]
+    }
+    stats = {"Berlin": [series_stats(history["Berlin"], "Berlin", term, WEEK) for term in TERMS]}
+    plan = plan_cycle(stats["Berlin"], budget=3, week_starting=WEEK)
+    carried = history["Berlin"][0]
+    serp_client.fail_for = {"Data Engineer"}
+
+    execute_plan(
+        plan, stats, history, serp_client, db_client, terms=TERMS, week_start=datetime(2025, 11, 17)
+    )
+
+    counts = db_client.saved_counts("Berlin")
+    assert counts.data_engineer == 100
+    assert counts.imputed == {"data_engineer": CARRIED_FORWARD}
+    assert counts.junior_data_engineer == len("Junior Data Engineer")
+    assert carried["data_engineer"] == 100
+    assert carried["imputed"] == {"data_engineer": CARRIED_FORWARD}
+
+
+def test_failed_save_does_not_lose_other_locations(serp_client, db_client):
+    """Test that one failing upsert does not stop the remaining locations being saved."""
+    history, stats = _new_and_stale_locations()
+    plan = plan_cycle(
+        [series for cells in stats.values() for series in cells], budget=6, week_starting=WEEK
+    )
+    db_client.fail_for = {"Berlin"}
+
+    execute_plan(
+        plan, stats, history, serp_client, db_client, terms=TERMS, week_start=datetime(2025, 11, 17)
+    )
+
+    assert [location for location, _, _ in db_client.saved] == ["Leipzig"]
@@ -0,0 +1,53 @@
+"""
+Tests for the SERP API client.
+"""
+
+import pytest
+
+from bernalytics.api import serp_client
+from bernalytics.api.serp_client import SerpClient
+
+
+def fake_search(results):
+    class FakeGoogleSearch:
+        def __init__(self, params):
+            pass
+
+        def get_dict(self):
+            return results
+
+    return FakeGoogleSearch
+
+
+def test_term_count_from_total_results(monkeypatch):
+    """Test that the count is read from search_information."""
+    results = {"search_information": {"total_results": "1,234"}}
+    monkeypatch.setattr(serp_client, "GoogleSearch", fake_search(results))
+
+    assert SerpClient(api_key="test").get_term_count("Data Engineer", "Berlin, Germany") == 1234
+
+
+def test_error_response_raises(monkeypatch):
+    """Test that an error body, e.g. an exhausted quota, is not reported as zero results."""
+    results = {"error": "Your account has run out of searches."}
+    monkeypatch.setattr(serp_client, "GoogleSearch", fake_search(results))
+
+    with pytest.raises(RuntimeError, match="run out of searches"):
+        SerpClient(api_key="test").get_term_count("Data Engineer", "Berlin, Germany")
+
+
+def test_no_results_is_zero(monkeypatch):
+    """Test that SerpAPI's empty-result error counts as a genuine zero."""
+    results = {"error": "Google hasn't returned any results for this query."}
+    monkeypatch.setattr(serp_client, "GoogleSearch", fake_search(results))
+
+    assert SerpClient(api_key="test").get_term_count("Data Engineer", "Berlin, Germany") == 0
+
+
+def test_job_counts_propagate_search_errors(monkeypatch):
+    """Test that a failed search fails the whole collection rather than storing zeros."""
+    results = {"error": "Your account has run out of searches."}
+    monkeypatch.setattr(serp_client, "GoogleSearch", fake_search(results))
+
+    with pytest.raises(RuntimeError):
+        SerpClient(api_key="test").get_job_counts(location="Berlin, Germany")
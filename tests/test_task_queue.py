@@ -0,0 +1,222 @@
+"""
+Tests for the lease-based task queue and queue worker.
+"""
+
+import multiprocessing
+import time
+from datetime import datetime
+
+from bernalytics.api.serp_client import search_terms
+from bernalytics.task_queue import SQLiteTaskQueue
+from bernalytics.utils.config import Config
+from bernalytics.worker import CollectionWorker, enqueue_week
+
+WEEK = datetime(2025, 11, 17)
+LOCATIONS = ["Berlin, Germany", "Munich, Germany"]
+
+
+def make_queue(tmp_path, **kwargs):
+    queue = SQLiteTaskQueue(tmp_path / "queue.sqlite3", **kwargs)
+    queue.enqueue(WEEK, LOCATIONS, search_terms())
+    return queue
+
+
+def test_enqueue_is_idempotent(tmp_path):
+    """Test that enqueuing a week twice does not duplicate tasks."""
+    queue = make_queue(tmp_path)
+
+    assert queue.enqueue(WEEK, LOCATIONS, search_terms()) == 0
+    assert len(queue.claim("w1", limit=100)) == 6
+
+
+def test_claimed_tasks_are_not_handed_out_twice(tmp_path):
+    """Test that leased tasks are invisible to other workers."""
+    queue = make_queue(tmp_path)
+
+    first = queue.claim("w1", limit=4)
+    second = queue.claim("w2", limit=4)
+
+    assert len(first) == 4
+    assert len(second) == 2
+    assert not {t.id for t in first} & {t.id for t in second}
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    """Test that tasks held by a dead worker are reclaimed after the lease expires."""
+    queue = make_queue(tmp_path, lease_seconds=0)
+
+    [task] = queue.claim("dead-worker")
+    time.sleep(0.01)
+    [reclaimed] = queue.claim("w2")
+
+    assert reclaimed.id == task.id
+    assert reclaimed.attempts == 2
+    assert not queue.complete(task.id, "dead-worker", 10)
+    assert queue.complete(task.id, "w2", 10)
+
+
+def test_task_completes_exactly_once(tmp_path):
+    """Test that a completed task cannot be completed or claimed again."""
+    queue = make_queue(tmp_path)
+
+    [task] = queue.claim("w1")
+    assert queue.complete(task.id, "w1", 5)
+    assert not queue.complete(task.id, "w1", 5)
+    assert task.id not in {t.id for t in queue.claim("w2", limit=100)}
+
+
+def test_exhausted_tasks_are_marked_failed(tmp_path):
+    """Test that a task is marked failed after max_attempts expired claims."""
+    queue = make_queue(tmp_path, lease_seconds=0, max_attempts=1)
+
+    claimed = queue.claim("w1", limit=100)
+    time.sleep(0.01)
+
+    assert queue.claim("w2", limit=100) == []
+    failed = queue.fail_exhausted()
+    assert {t.id for t in failed} == {t.id for t in claimed}
+    assert queue.fail_exhausted() == []
+    assert queue.group_results(WEEK.date().isoformat(), LOCATIONS[0]) is None
+
+
+def test_failed_search_is_retried_then_marked_failed(tmp_path, serp_client, db_client):
+    """Test that a raising search is never completed as zero but retried until exhausted."""
+    queue = make_queue(tmp_path, lease_seconds=0, max_attempts=2)
+    serp_client.fail_for = {"Berlin, Germany"}
+    # Let each zero-second lease run out before the next claim
+    serp_client.on_call = lambda location, term: time.sleep(0.01)
+    worker = CollectionWorker(queue, serp_client, db_client, worker_id="w1")
+
+    assert worker.run(exit_when_empty=True) == 3
+
+    berlin_calls = [call for call in serp_client.calls if call[0] == "Berlin, Germany"]
+    assert len(berlin_calls) == 6
+    assert [location for location, _, _ in db_client.saved] == ["Munich, Germany"]
+    assert queue.group_results(WEEK.date().isoformat(), "Berlin, Germany") is None
+    assert queue.enqueue(WEEK, LOCATIONS, search_terms()) == 0
+    assert len(queue.claim("w2", limit=100)) == 3
+
+
+def test_enqueue_requeues_failed_tasks(tmp_path):
+    """Test that re-running enqueue gives failed tasks another chance."""
+    queue = make_queue(tmp_path, lease_seconds=0, max_attempts=1)
+    queue.claim("w1", limit=100)
+    time.sleep(0.01)
+    queue.fail_exhausted()
+
+    assert queue.enqueue(WEEK, LOCATIONS, search_terms()) == 0
+    assert len(queue.claim("w2", limit=100)) == 6
+
+
+def test_renew_extends_lease(tmp_path):
+    """Test that a renewed task is not reclaimed by another worker."""
+    queue = make_queue(tmp_path, lease_seconds=0)
+    [task] = queue.claim("w1")
+
+    queue.lease_seconds = 300
+    assert queue.renew(task.id, "w1")
+    assert not queue.renew(task.id, "w2")
+    assert task.id not in {t.id for t in queue.claim("w2", limit=100)}
+
+
+def test_worker_releases_unstarted_tasks_on_stop(tmp_path, serp_client):
+    """Test that stopping mid-batch hands unstarted tasks back without using an attempt."""
+    queue = make_queue(tmp_path)
+    worker = CollectionWorker(queue, serp_client, worker_id="w1", batch_size=6)
+    serp_client.on_call = lambda location, term: worker.stop()
+
+    assert worker.run() == 1
+    remaining = queue.claim("w2", limit=100)
+    assert len(remaining) == 5
+    assert all(task.attempts == 1 for task in remaining)
+
+
+def test_failed_save_is_retried(tmp_path, serp_client, db_client):
+    """Test that a row whose save failed is written by a later sweep."""
+    queue = make_queue(tmp_path)
+    db_client.failures = 1
+    worker = CollectionWorker(queue, serp_client, db_client, worker_id="w1")
+
+    worker.run(exit_when_empty=True)
+
+    assert sorted(location for location, _, _ in db_client.saved) == LOCATIONS
+    assert queue.unsaved_groups() == []
+
+
+def test_enqueue_week_normalizes_to_monday(tmp_path):
+    """Test that any date in a week enqueues tasks keyed on its Monday."""
+    config = Config(
+        SERP_API_KEY="test",
+        QUEUE_PATH=str(tmp_path / "queue.sqlite3"),
+        DATA_DIR=str(tmp_path),
+        RAW_DATA_DIR=str(tmp_path),
+        PROCESSED_DATA_DIR=str(tmp_path),
+        LOCATION="Berlin, Germany",
+    )
+
+    enqueue_week(config, week_starting=datetime(2025, 11, 19))
+
+    queue = SQLiteTaskQueue(tmp_path / "queue.sqlite3")
+    assert {task.week_starting for task in queue.claim("w1", limit=100)} == {"2025-11-17"}
+
+
+def test_enqueue_week_covers_all_locations(tmp_path):
+    """Test that enqueue creates tasks for every location in LOCATIONS."""
+    config = Config(
+        SERP_API_KEY="test",
+        QUEUE_PATH=str(tmp_path / "queue.sqlite3"),
+        DATA_DIR=str(tmp_path),
+        RAW_DATA_DIR=str(tmp_path),
+        PROCESSED_DATA_DIR=str(tmp_path),
+        LOCATIONS="; ".join(LOCATIONS),
+    )
+
+    assert enqueue_week(config, week_starting=WEEK) == 6
+
+    queue = SQLiteTaskQueue(tmp_path / "queue.sqlite3")
+    assert {task.location for task in queue.claim("w1", limit=100)} == set(LOCATIONS)
+
+
+def test_worker_saves_row_when_location_complete(tmp_path, serp_client, db_client):
+    """Test that the worker assembles and saves one row per location."""
+    queue = make_queue(tmp_path)
+    worker = CollectionWorker(queue, serp_client, db_client, worker_id="w1")
+
+    completed = worker.run(exit_when_empty=True)
+
+    assert completed == 6
+    assert len(serp_client.calls) == 6
+    assert sorted(location for location, _, _ in db_client.saved) == LOCATIONS
+    _, week_starting, counts = db_client.saved[0]
+    assert week_starting == WEEK
+    assert counts.junior_data_engineer == len("Junior Data Engineer")
+
+
+def _drain(path, worker_id, serp_client, results):
+    # Each forked process works on its own copy of the stub
+    queue = SQLiteTaskQueue(path)
+    CollectionWorker(queue, serp_client, worker_id=worker_id).run(exit_when_empty=True)
+    results.put(serp_client.calls)
+
+
+def test_parallel_workers_split_work_without_duplicates(tmp_path, serp_client):
+    """Test that concurrent worker processes never run the same task twice."""
+    queue = make_queue(tmp_path)
+    queue.enqueue(WEEK, [f"City {i}, Germany" for i in range(30)], search_terms())
+
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(
+            target=_drain,
+            args=(tmp_path / "queue.sqlite3", f"w{i}", serp_client, results),
+        )
+        for i in range(4)
+    ]
+    for process in workers:
+        process.start()
+    calls = [call for _ in workers for call in results.get(timeout=30)]
+    for process in workers:
+        process.join(timeout=30)
+
+    assert len(calls) == 96
+    assert len(set(calls)) == 96